@@ -0,0 +1,68 @@
+"""Measures the time it takes to `import bocas` in a fresh interpreter.
+
+Exits with a non-zero status if the median import time exceeds `--max_seconds`, or
+if importing `bocas` pulls in any of the heavy modules that it loads lazily.
+
+Usage:
+```
+python benchmarks/import_time.py --repeats=10 --max_seconds=0.5
+```
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+from absl import flags
+
+flags.DEFINE_integer("repeats", 10, "number of fresh interpreters to time.")
+flags.DEFINE_float("max_seconds", 0.5, "maximum allowed median import time.")
+
+# Modules that `import bocas` must not import.
+LAZY_MODULES = ["tensorflow", "keras", "numpy", "ml_collections"]
+
+SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import bocas
+elapsed = time.perf_counter() - start
+eager = [m for m in {LAZY_MODULES!r} if m in sys.modules]
+print(json.dumps([elapsed, eager]))
+"""
+
+
+def time_import():
+    output = subprocess.check_output([sys.executable, "-c", SCRIPT], text=True)
+    elapsed, eager = json.loads(output.strip().splitlines()[-1])
+    return elapsed, eager
+
+
+def main():
+    FLAGS = flags.FLAGS
+    FLAGS(sys.argv)
+
+    timings = []
+    eager_modules = set()
+    for _ in range(FLAGS.repeats):
+        elapsed, eager = time_import()
+        timings.append(elapsed)
+        eager_modules.update(eager)
+
+    median = statistics.median(timings)
+    print(
+        f"import bocas: median {median * 1000:.1f}ms, max {max(timings) * 1000:.1f}ms"
+    )
+
+    failed = False
+    if eager_modules:
+        print(f"FAIL: `import bocas` imported {sorted(eager_modules)}")
+        failed = True
+    if median > FLAGS.max_seconds:
+        print(f"FAIL: median import time exceeds {FLAGS.max_seconds}s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
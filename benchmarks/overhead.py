@@ -0,0 +1,225 @@
+"""Benchmarks the overhead `bocas` itself adds to a sweep.
+
+No models are trained: synthetic tasks return synthetic `Result` objects with long
+`KerasHistory` histories and many `Metrics`.  Each benchmark reports its wall time,
+throughput and the peak resident memory of the process while it ran, as one JSON
+object per line, so that runs from different commits can be compared.
+
+Usage:
+```
+python benchmarks/overhead.py --num_results=1000 --output=bench.jsonl
+python benchmarks/overhead.py --benchmarks=load_collection --num_results=100000
+```
+"""
+
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import ml_collections
+from absl import flags
+
+import bocas
+from bocas import profiling
+from bocas.run import _iter_configs, fallback_to_pickle, serialize_yaml
+
+flags.DEFINE_list(
+    "benchmarks",
+    [
+        "expand_sweep",
+        "serialize_yaml",
+        "serialize_pickle",
+        "load",
+        "load_metrics_only",
+        "load_collection",
+        "iter_collection",
+        "load_packed",
+        "run",
+    ],
+    "benchmarks to run.",
+)
+flags.DEFINE_integer("sweep_size", 10, "number of values in each swept key.")
+flags.DEFINE_integer("sweep_keys", 4, "number of swept keys.")
+flags.DEFINE_integer("num_results", 1000, "number of result directories to load.")
+flags.DEFINE_integer("num_serialized", 100, "number of results to serialize.")
+flags.DEFINE_integer("epochs", 500, "length of each `KerasHistory` history.")
+flags.DEFINE_integer("num_metrics", 20, "number of metrics in each artifact.")
+flags.DEFINE_integer(
+    "workers", None, "processes used by the `iter_collection` benchmark."
+)
+flags.DEFINE_string("output", None, "file to append the JSON results to.")
+
+FLAGS = flags.FLAGS
+
+
+def make_result(i):
+    history = {
+        f"metric_{m}": [random.random() for _ in range(FLAGS.epochs)]
+        for m in range(FLAGS.num_metrics)
+    }
+    metrics = {f"metric_{m}": random.random() for m in range(FLAGS.num_metrics)}
+    config = ml_collections.ConfigDict({"index": i, "model": "synthetic"})
+    return bocas.Result(
+        name=f"result-{i}",
+        artifacts=[
+            bocas.artifacts.KerasHistory(history, name="fit_history"),
+            bocas.artifacts.Metrics(metrics, name="eval_metrics"),
+        ],
+        config=config,
+    )
+
+
+def synthetic_task(config):
+    return make_result(config.index)
+
+
+def write_collection(directory, num_results):
+    """Writes `num_results` results, reusing one serialized result as a template."""
+    template = os.path.join(directory, "result-0")
+    os.makedirs(template)
+    serialize_yaml(make_result(0), template)
+    for i in range(1, num_results):
+        shutil.copytree(template, os.path.join(directory, f"result-{i}"))
+
+
+def bench_expand_sweep(_):
+    config = {
+        f"key_{k}": bocas.Sweep(list(range(FLAGS.sweep_size)))
+        for k in range(FLAGS.sweep_keys)
+    }
+    config["static"] = "value"
+    count = sum(1 for _ in _iter_configs(config))
+    return count, {"sweep_size": FLAGS.sweep_size, "sweep_keys": FLAGS.sweep_keys}
+
+
+def bench_serialize_yaml(directory):
+    results = [make_result(i) for i in range(FLAGS.num_serialized)]
+    for result in results:
+        result_dir = os.path.join(directory, result.name)
+        os.makedirs(result_dir)
+        serialize_yaml(result, result_dir)
+    return len(results), {"epochs": FLAGS.epochs, "num_metrics": FLAGS.num_metrics}
+
+
+def bench_serialize_pickle(directory):
+    results = [make_result(i) for i in range(FLAGS.num_serialized)]
+    for result in results:
+        result_dir = os.path.join(directory, result.name)
+        os.makedirs(result_dir)
+        fallback_to_pickle(result, result_dir)
+    return len(results), {"epochs": FLAGS.epochs, "num_metrics": FLAGS.num_metrics}
+
+
+def bench_load(directory):
+    write_collection(directory, FLAGS.num_serialized)
+    start = time.perf_counter()
+    for i in range(FLAGS.num_serialized):
+        bocas.Result.load(os.path.join(directory, f"result-{i}"))
+    elapsed = time.perf_counter() - start
+    params = {"epochs": FLAGS.epochs, "num_metrics": FLAGS.num_metrics}
+    return FLAGS.num_serialized, params, elapsed
+
+
+def bench_load_metrics_only(directory):
+    write_collection(directory, FLAGS.num_serialized)
+    start = time.perf_counter()
+    for i in range(FLAGS.num_serialized):
+        path = os.path.join(directory, f"result-{i}")
+        bocas.Result.load(path, artifacts=["eval_metrics"])
+    elapsed = time.perf_counter() - start
+    params = {"epochs": FLAGS.epochs, "num_metrics": FLAGS.num_metrics}
+    return FLAGS.num_serialized, params, elapsed
+
+
+def bench_load_collection(directory):
+    write_collection(directory, FLAGS.num_results)
+    start = time.perf_counter()
+    count = len(bocas.Result.load_collection(directory))
+    return count, {"num_results": FLAGS.num_results}, time.perf_counter() - start
+
+
+def bench_iter_collection(directory):
+    write_collection(directory, FLAGS.num_results)
+    start = time.perf_counter()
+    count = sum(
+        1 for _ in bocas.Result.iter_collection(directory, workers=FLAGS.workers)
+    )
+    elapsed = time.perf_counter() - start
+    return count, {"num_results": FLAGS.num_results, "workers": FLAGS.workers}, elapsed
+
+
+def bench_load_packed(directory):
+    write_collection(os.path.join(directory, "results"), FLAGS.num_results)
+    archive = os.path.join(directory, "results.zip")
+    bocas.Result.pack_collection(os.path.join(directory, "results"), archive)
+    start = time.perf_counter()
+    count = len(bocas.Result.load_collection(archive))
+    return count, {"num_results": FLAGS.num_results}, time.perf_counter() - start
+
+
+def bench_run(directory):
+    config = ml_collections.ConfigDict()
+    config.index = bocas.Sweep(list(range(FLAGS.num_serialized)))
+    count = len(bocas.run(synthetic_task, config, artifact_dir=directory))
+    return count, {"num_configs": FLAGS.num_serialized}
+
+
+def run_benchmark(name):
+    """Runs a benchmark, and returns its measurements as a dictionary.
+
+    Benchmarks return `(count, params)`, or `(count, params, elapsed)` when only
+    part of their work should be timed.
+    """
+    directory = tempfile.mkdtemp(prefix=f"bocas-{name}-")
+    try:
+        profiling.reset_peak_rss()
+        start = time.perf_counter()
+        outputs = globals()[f"bench_{name}"](directory)
+        elapsed = time.perf_counter() - start
+        if len(outputs) == 3:
+            count, params, elapsed = outputs
+        else:
+            count, params = outputs
+        return {
+            "benchmark": name,
+            "commit": _git_commit(),
+            "params": params,
+            "count": count,
+            "seconds": elapsed,
+            "throughput": count / elapsed if elapsed > 0 else None,
+            "peak_rss_bytes": profiling.peak_rss(),
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    FLAGS(sys.argv)
+    for name in FLAGS.benchmarks:
+        measurement = run_benchmark(name)
+        line = json.dumps(measurement)
+        print(line)
+        if FLAGS.output:
+            with open(FLAGS.output, "a") as f:
+                f.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compares the speed of the `bocas` YAML Loader/Dumper against PyYAML's defaults.
+
+Usage:
+```
+python benchmarks/yaml_serialization.py --epochs=500 --num_metrics=20
+```
+"""
+
+import random
+import sys
+import time
+
+import yaml
+from absl import flags
+
+import bocas
+from bocas import yamlify
+from bocas.result import result_constructor, result_representer
+
+flags.DEFINE_integer("num_results", 20, "number of results to dump and load.")
+flags.DEFINE_integer("epochs", 500, "length of each `KerasHistory` history.")
+flags.DEFINE_integer("num_metrics", 20, "number of metrics tracked in each history.")
+
+
+def make_result(i, epochs, num_metrics):
+    history = {
+        f"metric_{m}": [random.random() for _ in range(epochs)]
+        for m in range(num_metrics)
+    }
+    metrics = {f"metric_{m}": random.random() for m in range(num_metrics)}
+    return bocas.Result(
+        name=f"result-{i}",
+        artifacts=[
+            bocas.artifacts.KerasHistory(history, name="fit_history"),
+            bocas.artifacts.Metrics(metrics, name="eval_metrics"),
+        ],
+    )
+
+
+def time_it(fn, items):
+    start = time.perf_counter()
+    outputs = [fn(item) for item in items]
+    return time.perf_counter() - start, outputs
+
+
+def main():
+    FLAGS = flags.FLAGS
+    FLAGS(sys.argv)
+
+    # The pure Python implementation `bocas` used before it owned its Loader/Dumper.
+    yamlify.configure_custom_yaml(loader=yaml.FullLoader, dumper=yaml.Dumper)
+    yaml.add_representer(bocas.Result, result_representer, Dumper=yaml.Dumper)
+    yaml.add_constructor("!Result", result_constructor, Loader=yaml.FullLoader)
+
+    results = [
+        make_result(i, FLAGS.epochs, FLAGS.num_metrics)
+        for i in range(FLAGS.num_results)
+    ]
+
+    implementations = {
+        "pyyaml": (
+            lambda r: yaml.dump(r, Dumper=yaml.Dumper, default_flow_style=False),
+            lambda s: yaml.load(s, Loader=yaml.FullLoader),
+        ),
+        "bocas": (yamlify.dump, yamlify.load),
+    }
+    timings = {}
+    for name, (dump, load) in implementations.items():
+        dump_time, serialized = time_it(dump, results)
+        load_time, _ = time_it(load, serialized)
+        timings[name] = (dump_time, load_time)
+        print(f"{name:>8}: dump {dump_time:8.3f}s  load {load_time:8.3f}s")
+
+    dump_speedup = timings["pyyaml"][0] / timings["bocas"][0]
+    load_speedup = timings["pyyaml"][1] / timings["bocas"][1]
+    print(f" speedup: dump {dump_speedup:7.1f}x  load {load_speedup:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
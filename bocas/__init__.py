@@ -1,7 +1,31 @@
 __version__ = "0.0.2"
 
+from bocas.checkpoint import Checkpoint
+from bocas.index import Index
 from bocas.result import Result
-from bocas.run import run
-from bocas.sweep import Sweep
+from bocas.run import run, run_iter
+from bocas.scheduler import Hyperband, Pruned, SuccessiveHalving, report
+from bocas.stages import cached_stage
+from bocas.sweep import (
+    AdaptiveSweep,
+    Choice,
+    Distribution,
+    IntUniform,
+    RandomSweep,
+    SobolSweep,
+    Sweep,
+    Uniform,
+    Zip,
+)
+from bocas.watcher import Watcher, watch
 
 from . import artifacts
+
+
+def __getattr__(name):
+    # `ResultCollection` depends on numpy, which is only imported once it is used.
+    if name == "ResultCollection":
+        from bocas.result_collection import ResultCollection
+
+        return ResultCollection
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
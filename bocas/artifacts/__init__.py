@@ -1,3 +1,16 @@
 from bocas.artifacts.artifact import Artifact
+from bocas.artifacts.history_log import read_history_log, tail_history_log
 from bocas.artifacts.keras_history import KerasHistory
+from bocas.artifacts.lazy_artifact import LazyArtifact
 from bocas.artifacts.metrics import Metrics
+from bocas.artifacts.profile import Profile
+
+
+def __getattr__(name):
+    # `StreamingKerasHistory` subclasses a Keras callback, so TensorFlow is only
+    # imported once it is used.
+    if name == "StreamingKerasHistory":
+        from bocas.artifacts.streaming_keras_history import StreamingKerasHistory
+
+        return StreamingKerasHistory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,12 +1,23 @@
+from bocas import slots
 from bocas.yaml_utils import parse_yaml_node
 
 
 class Artifact:
     yaml_tag = "!Artifact"
 
+    # Subclasses declare their own `__slots__`, so that large collections of
+    # artifacts don't pay for a `__dict__` each.
+    __slots__ = ("name",)
+
     def __init__(self, name=None):
         self.name = name
 
+    def __getstate__(self):
+        return slots.get_state(self)
+
+    def __setstate__(self, state):
+        slots.set_state(self, state)
+
     def to_yaml(self):
         return {"name": self.name}
 
@@ -0,0 +1,50 @@
+import json
+import os
+
+HISTORY_LOG = "history.jsonl"
+
+
+def read_history_log(path):
+    """Reads a `history.jsonl` log into a `KerasHistory` style history dictionary.
+
+    If an epoch was logged more than once, i.e. because training was resumed, the
+    last record for that epoch wins.
+    """
+    records, _ = tail_history_log(path)
+    by_epoch = {record["epoch"]: record for record in records}
+    history = {}
+    for epoch in sorted(by_epoch):
+        for key, value in by_epoch[epoch].items():
+            if key != "epoch":
+                history.setdefault(key, []).append(value)
+    return history
+
+
+def tail_history_log(path, offset=0):
+    """Reads the epochs appended to a `history.jsonl` log since `offset`.
+
+    Only complete lines are read, so this is safe to call while the log is written.
+
+    Usage:
+    ```python
+    offset = 0
+    while training:
+        records, offset = bocas.artifacts.tail_history_log(path, offset)
+        ...
+    ```
+
+    Returns:
+        a tuple of the list of new epoch records, and the offset to pass to the next
+        call.
+    """
+    if not os.path.exists(path):
+        return [], offset
+    records = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            records.append(json.loads(line))
+            offset += len(line)
+    return records, offset
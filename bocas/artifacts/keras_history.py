@@ -1,6 +1,5 @@
 from bocas.artifacts.artifact import Artifact
-from bocas.yaml_utils import parse_yaml_node
-from tensorflow.keras.callbacks import History
+from bocas.yaml_utils import as_numeric_array, parse_yaml_node
 
 
 class KerasHistory(Artifact):
@@ -8,12 +7,14 @@ class KerasHistory(Artifact):
 
     yaml_tag = "!KerasHistory"
 
+    __slots__ = ("history",)
+
     def __init__(self, history, **kwargs):
         super().__init__(**kwargs)
-        if isinstance(history, History):
-            self.history = history.history
-        elif isinstance(history, dict):
+        if isinstance(history, dict):
             self.history = history
+        elif _is_keras_history(history):
+            self.history = history.history
         else:
             raise ValueError(
                 f"Expected `history` to be a `tensorflow.keras.callbacks.History` or a "
@@ -27,9 +28,18 @@ class KerasHistory(Artifact):
 
     def to_yaml(self):
         config = super().to_yaml()
-        config.update({"history": self.history})
+        history = {key: as_numeric_array(v) for key, v in self.history.items()}
+        config.update({"history": history})
         return config
 
     @classmethod
     def from_yaml(cls, loader, node):
         return cls(**parse_yaml_node(loader, node))
+
+
+def _is_keras_history(history):
+    # Checked by name so that TensorFlow doesn't need to be imported: a `History`
+    # from either `tf.keras` or standalone `keras` is accepted.
+    return type(history).__name__ == "History" and isinstance(
+        getattr(history, "history", None), dict
+    )
@@ -0,0 +1,49 @@
+from bocas.artifacts.artifact import Artifact
+
+
+class LazyArtifact(Artifact):
+    """LazyArtifact stands in for an artifact of a `Result` that isn't loaded yet.
+
+    `bocas.Result.load(path, artifacts=[...])` returns the artifacts that weren't
+    requested as `LazyArtifact`s.  `Result.get()` replaces them with the real
+    artifact on first access, and accessing any other attribute loads it as well.
+
+    In `results.yaml`, each artifact is stored as a reference to its own file.
+    `LazyArtifact` is also the in-memory form of such a reference.
+
+    Args:
+        name: name of the referenced artifact.
+        path: path of the artifact's YAML file, relative to the result directory.
+        source: (Optional) object with a `load_artifact(path)` method, used to load
+            the artifact.
+    """
+
+    yaml_tag = "!ArtifactRef"
+
+    __slots__ = ("path", "source", "_artifact")
+
+    def __init__(self, name, path, source=None):
+        super().__init__(name=name)
+        self.path = path
+        self.source = source
+        self._artifact = None
+
+    def materialize(self):
+        """Loads and returns the referenced artifact."""
+        if self._artifact is None:
+            if self.source is None:
+                raise ValueError(
+                    f"Can't load the artifact `{self.name}` referenced by `{self.path}` "
+                    "without a `source`."
+                )
+            self._artifact = self.source.load_artifact(self.path)
+        return self._artifact
+
+    def __getattr__(self, key):
+        # Slots may not be set yet while unpickling.
+        if key in ("name", "path", "source", "_artifact"):
+            raise AttributeError(key)
+        return getattr(self.materialize(), key)
+
+    def to_yaml(self):
+        return {"name": self.name, "path": self.path}
@@ -1,5 +1,5 @@
 from bocas.artifacts.artifact import Artifact
-from bocas.yaml_utils import parse_yaml_node
+from bocas.yaml_utils import as_numeric_array, parse_yaml_node
 
 
 class Metrics(Artifact):
@@ -7,6 +7,8 @@ class Metrics(Artifact):
 
     yaml_tag = "!Metrics"
 
+    __slots__ = ("metrics",)
+
     def __init__(self, metrics, **kwargs):
         super().__init__(**kwargs)
         # TODO(lukewood): override get item to return metrics item
@@ -14,7 +16,10 @@ class Metrics(Artifact):
 
     def to_yaml(self):
         config = super().to_yaml()
-        config.update({"metrics": self.metrics})
+        metrics = self.metrics
+        if isinstance(metrics, dict):
+            metrics = {key: as_numeric_array(v) for key, v in metrics.items()}
+        config.update({"metrics": metrics})
         return config
 
     @classmethod
@@ -0,0 +1,49 @@
+from bocas.artifacts.metrics import Metrics
+
+
+class Profile(Metrics):
+    """Profile records the resources `bocas.run()` spent on a single config.
+
+    `bocas.run()` attaches a `Profile` named "profile" to every `Result` it produces.
+    It is stored in `profile.yaml` next to the result.  Because it is a `Metrics`
+    artifact, its values show up as `profile/*` columns in `bocas.ResultCollection`
+    and in `bocas.Index`.
+
+    The recorded metrics are:
+        - `wall_time`: seconds spent in the task's `run()`.
+        - `cpu_time`: CPU seconds spent in the task's `run()`.
+        - `peak_rss`: peak resident set size, in bytes, of the process running the
+          task.  On Linux the peak is reset before each config, elsewhere it is the
+          peak of the whole worker process.
+        - `serialization_time`: seconds spent writing the result.
+        - `serialization_format`: either "yaml", or "pickle" if YAML serialization
+          failed.
+        - `serialized_bytes`: total size of the files written for the result.
+
+    Any values recorded by the `profile_hooks` passed to `bocas.run()` are included
+    as well.
+    """
+
+    yaml_tag = "!Profile"
+
+    # `cprofile` holds the `cProfile.Profile` of `bocas.profiling.profile_task()`
+    # until its stats are written, it is never serialized.
+    __slots__ = ("cprofile",)
+
+    def __init__(self, metrics=None, name="profile", **kwargs):
+        super().__init__(metrics or {}, name=name, **kwargs)
+        self.cprofile = None
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.pop("cprofile", None)
+        return state
+
+    def __getattr__(self, key):
+        # `metrics` may not be set yet while unpickling.
+        if key in ("metrics", "cprofile"):
+            raise AttributeError(key)
+        metrics = self.metrics
+        if key in metrics:
+            return metrics[key]
+        raise AttributeError(f"`Profile` has no metric `{key}`")
@@ -0,0 +1,56 @@
+import json
+import os
+
+from tensorflow.keras.callbacks import Callback
+
+from bocas.artifacts.history_log import HISTORY_LOG, read_history_log
+from bocas.artifacts.keras_history import KerasHistory
+
+
+class StreamingKerasHistory(Callback):
+    """StreamingKerasHistory writes the logs of each epoch to disk as it finishes.
+
+    Every epoch is appended as one JSON line to `history.jsonl` in `log_dir`,
+    typically the directory the result will be written to.  This makes the progress
+    of long `model.fit()` calls visible while they run, and the log can be tailed
+    cheaply with `bocas.artifacts.tail_history_log()`.
+
+    Usage:
+    ```python
+    streaming_history = bocas.artifacts.StreamingKerasHistory(
+        os.path.join(config.artifact_dir, name)
+    )
+    model.fit(train_ds, epochs=100, callbacks=[streaming_history])
+    return bocas.Result(
+        name=name,
+        artifacts=[streaming_history.to_artifact(name="fit_history")],
+    )
+    ```
+
+    Args:
+        log_dir: directory to write `history.jsonl` to.
+        append: whether to keep the epochs already present in the log, for example
+            when resuming training.  Defaults to `False`, which starts a fresh log.
+    """
+
+    def __init__(self, log_dir, append=False):
+        super().__init__()
+        self.path = os.path.join(log_dir, HISTORY_LOG)
+        self.append = append
+
+    def on_train_begin(self, logs=None):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if not self.append and os.path.exists(self.path):
+            os.remove(self.path)
+        # Subsequent calls to `fit()` continue the same log.
+        self.append = True
+
+    def on_epoch_end(self, epoch, logs=None):
+        record = {"epoch": epoch}
+        record.update({key: float(value) for key, value in (logs or {}).items()})
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def to_artifact(self, name=None):
+        """Materializes the log into a `bocas.artifacts.KerasHistory`."""
+        return KerasHistory(read_history_log(self.path), name=name)
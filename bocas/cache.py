@@ -0,0 +1,56 @@
+import hashlib
+import inspect
+import json
+import os
+
+import yaml
+
+from bocas.writer import atomic_write
+
+CACHE_FILE = "cache.yaml"
+RESULT_FILES = ("results.yaml", "results.p")
+
+
+def config_hash(config):
+    """Returns a stable hash of an expanded `ml_collections.ConfigDict`."""
+    if hasattr(config, "to_dict"):
+        config = config.to_dict()
+    serialized = json.dumps(config, sort_keys=True, default=repr)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def task_fingerprint(path):
+    """Returns a hash of the source of the task found at `path`.
+
+    `path` may either be the path to a `run.py` file, or the `run()` callable itself.
+    Editing the task invalidates every cached result produced by it.  Returns `None`
+    if the source of a callable can't be found, i.e. if it was defined in a REPL;
+    results of such tasks are never reused.
+    """
+    if isinstance(path, str):
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    try:
+        with open(inspect.getsourcefile(path), "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except (OSError, TypeError):
+        pass
+    # Notebooks keep the source of their cells in `linecache` rather than on disk.
+    try:
+        source = inspect.getsource(path)
+    except (OSError, TypeError):
+        return None
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def write_cache_entry(result_dir, config_hash, task_fingerprint, pruned_by=None):
+    """Records which config and version of the task produced the result.
+
+    `pruned_by` is the `state_id()` of the scheduler that stopped the config early.
+    Such results are only reused by launches with the same scheduler.
+    """
+    entry = {"config_hash": config_hash, "task_fingerprint": task_fingerprint}
+    if pruned_by is not None:
+        entry["pruned_by"] = pruned_by
+    serialized = yaml.safe_dump(entry, default_flow_style=False)
+    atomic_write(os.path.join(result_dir, CACHE_FILE), serialized)
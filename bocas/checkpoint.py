@@ -0,0 +1,167 @@
+import contextlib
+import os
+import pickle
+import shutil
+import time
+import uuid
+
+from termcolor import cprint
+
+from bocas.writer import atomic_write
+
+CHECKPOINT_DIR = "checkpoint"
+LATEST_FILE = "LATEST"
+STATE_FILE = "state.p"
+
+# `(artifact_dir, config_hash)` of the config currently being run, set by
+# `bocas.run()`.
+_current = None
+
+
+@contextlib.contextmanager
+def checkpoint_context(artifact_dir, config_hash):
+    """Makes `bocas.Checkpoint` default to `artifact_dir` within the context."""
+    global _current
+    previous = _current
+    _current = (artifact_dir, config_hash)
+    try:
+        yield
+    finally:
+        _current = previous
+
+
+class Checkpoint:
+    """Checkpoint saves the in-flight state of a config, so that it can be resumed.
+
+    Checkpoints are stored in `artifact_dir/<name>/checkpoint/`.  If a config is
+    interrupted, i.e. by the preemption of its node, it has no result yet, so
+    re-launching the sweep runs it again; `restore()` then returns the state it
+    last saved, and training picks up from there.  Once the result of the config is
+    written, `bocas.run()` removes its checkpoint.
+
+    Each save is written to a new directory, and `LATEST` is atomically pointed at
+    it once complete, so an interrupted save leaves the previous checkpoint intact.
+    Checkpoints record the hash of the config that saved them, and are only
+    restored by the same config.
+
+    Usage:
+    ```python
+    def run(config):
+        checkpoint = bocas.Checkpoint(name)
+        state = checkpoint.restore() or {"epoch": 0, "history": []}
+        if checkpoint.restored:
+            model.load_weights(checkpoint.path("model.weights.h5"))
+        for epoch in range(state["epoch"], 100):
+            ...
+            state["epoch"] = epoch + 1
+            checkpoint.save(state, files={"model.weights.h5": model.save_weights})
+    ```
+
+    Args:
+        name: name of the result the config produces.
+        artifact_dir: (Optional) directory the result is written to.  Defaults to
+            the `artifact_dir` of the `bocas.run()` running the task.
+        keep: number of checkpoints to keep.
+    """
+
+    def __init__(self, name, artifact_dir=None, keep=1):
+        if artifact_dir is None:
+            if _current is None:
+                raise ValueError(
+                    "Expected `artifact_dir` to be passed to `bocas.Checkpoint` "
+                    "outside of `bocas.run()`."
+                )
+            artifact_dir = _current[0]
+        if keep < 1:
+            raise ValueError(f"Expected `keep` to be at least 1, got {keep}")
+        self.directory = os.path.join(artifact_dir, name, CHECKPOINT_DIR)
+        self.config_hash = _current[1] if _current is not None else None
+        self.keep = keep
+        # Directory of the checkpoint returned by `restore()`.
+        self.restored = None
+
+    def save(self, state, files=None):
+        """Saves `state` and `files` as the latest checkpoint.
+
+        Args:
+            state: any picklable object, i.e. `{"epoch": epoch, "history": history}`.
+            files: (Optional) dictionary mapping file names to callables writing the
+                file to the path they are given, i.e. `model.save_weights`.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        # Generations sort in the order they were saved.
+        generation = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        tmp_dir = os.path.join(self.directory, f".{generation}.tmp")
+        os.makedirs(tmp_dir)
+        try:
+            with open(os.path.join(tmp_dir, STATE_FILE), "wb") as f:
+                pickle.dump({"config_hash": self.config_hash, "state": state}, f)
+            for filename, write in (files or {}).items():
+                write(os.path.join(tmp_dir, filename))
+            os.rename(tmp_dir, os.path.join(self.directory, generation))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        atomic_write(os.path.join(self.directory, LATEST_FILE), generation)
+        self._remove_old_generations(generation)
+
+    def restore(self):
+        """Returns the state of the latest checkpoint, or `None` if there is none.
+
+        Once a checkpoint is restored, `path()` returns the paths of its files.
+        """
+        try:
+            with open(os.path.join(self.directory, LATEST_FILE), "r") as f:
+                generation = f.read().strip()
+            with open(os.path.join(self.directory, generation, STATE_FILE), "rb") as f:
+                saved = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            cprint(f"Failed to read the checkpoint in {self.directory}: {e}.", "red")
+            return None
+
+        if None not in (self.config_hash, saved["config_hash"]) and (
+            saved["config_hash"] != self.config_hash
+        ):
+            cprint(
+                f"Ignoring the checkpoint in {self.directory}, it was saved by "
+                "another config.",
+                "yellow",
+            )
+            return None
+        self.restored = os.path.join(self.directory, generation)
+        cprint(f"Resuming from the checkpoint in {self.restored}.", "green")
+        return saved["state"]
+
+    def path(self, filename):
+        """Returns the path of `filename` in the restored checkpoint."""
+        if self.restored is None:
+            raise ValueError(
+                "Expected `restore()` to have returned a checkpoint before calling "
+                "`path()`."
+            )
+        return os.path.join(self.restored, filename)
+
+    def clear(self):
+        """Removes every checkpoint."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _remove_old_generations(self, latest):
+        generations = sorted(
+            entry.name
+            for entry in os.scandir(self.directory)
+            if entry.is_dir() and not entry.name.startswith(".")
+        )
+        stale = generations[: -self.keep]
+        # Saves interrupted before they completed leave temporary directories.
+        stale += [
+            entry.name
+            for entry in os.scandir(self.directory)
+            if entry.is_dir() and entry.name.endswith(".tmp")
+        ]
+        for generation in stale:
+            if generation != latest:
+                shutil.rmtree(
+                    os.path.join(self.directory, generation), ignore_errors=True
+                )
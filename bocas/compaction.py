@@ -0,0 +1,94 @@
+import sys
+
+from bocas.artifacts import KerasHistory, Metrics
+from bocas.yaml_utils import as_numeric_array
+
+
+class Compactor:
+    """Compactor reduces the memory held by many `bocas.Result` loaded together.
+
+    Results from a sweep mostly repeat each other: every config holds the same
+    static keys, and every artifact the same metric names.  `compact()` rewrites a
+    result in place so that:
+        - config keys, artifact names and metric names are interned strings.
+        - equal config values are shared between results.
+        - equal nested config sections are shared between results, as one
+          `ConfigDict`.
+        - lists of numbers in `Metrics` and `KerasHistory` artifacts become
+          `np.ndarray`, instead of lists of boxed Python floats.
+
+    Because config sections are shared, compacted results should be treated as
+    read-only.
+
+    Usage:
+    ```python
+    compactor = Compactor()
+    results = [compactor.compact(r) for r in bocas.Result.iter_collection(path)]
+    ```
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._sections = {}
+
+    def compact(self, result):
+        result.name = _intern(result.name)
+        if result.config is not None:
+            result.config = self._config(result.config, nested=False)
+        for artifact in result.artifacts:
+            artifact.name = _intern(artifact.name)
+            if isinstance(artifact, Metrics) and isinstance(artifact.metrics, dict):
+                artifact.metrics = self._arrays(artifact.metrics)
+            elif isinstance(artifact, KerasHistory):
+                artifact.history = self._arrays(artifact.history)
+        return result
+
+    def _config(self, config, nested):
+        if not hasattr(config, "items"):
+            return config
+        if nested:
+            key = _section_key(config)
+            if key is not None and key in self._sections:
+                return self._sections[key]
+        fields = {
+            _intern(name): (
+                self._config(value, nested=True)
+                if hasattr(value, "items")
+                else self._value(value)
+            )
+            for name, value in config.items()
+        }
+        compacted = type(config)(fields)
+        if nested and key is not None:
+            self._sections[key] = compacted
+        return compacted
+
+    def _arrays(self, values):
+        return {_intern(key): as_numeric_array(v) for key, v in values.items()}
+
+    def _value(self, value):
+        if isinstance(value, str):
+            return sys.intern(value)
+        try:
+            # Keyed by type as well, so that `1`, `1.0` and `True` stay distinct.
+            return self._values.setdefault((type(value), value), value)
+        except TypeError:
+            return value
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _section_key(config):
+    try:
+        return _canonical(config.to_dict() if hasattr(config, "to_dict") else config)
+    except TypeError:
+        # Keys that can't be sorted.
+        return None
+
+
+def _canonical(value):
+    if hasattr(value, "items"):
+        return tuple(sorted((k, _canonical(v)) for k, v in value.items()))
+    return type(value).__name__, repr(value)
@@ -0,0 +1,30 @@
+import hashlib
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+
+def import_file(path):
+    """Imports the Python source file at `path`, and returns its module.
+
+    Each file is imported as its own module, named after its absolute path, so that
+    a process importing several files, i.e. a `bocas.server` worker running several
+    tasks, never executes one file into another's globals.  Importing the same file
+    again executes it into a fresh module.
+    """
+    path = os.path.abspath(path)
+    digest = hashlib.sha256(path.encode("utf-8")).hexdigest()[:16]
+    name = f"_bocas_file_{digest}"
+    # An explicit loader, so that files without a `.py` suffix can be imported too.
+    spec = importlib.util.spec_from_file_location(
+        name, path, loader=importlib.machinery.SourceFileLoader(name, path)
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
@@ -0,0 +1,241 @@
+import json
+import os
+import sqlite3
+
+import yaml
+
+from bocas import cache
+from bocas.result import Result
+from bocas.summary import flatten_config, normalize, scalar_metrics, to_json
+
+INDEX_DIR = ".bocas"
+INDEX_FILE = "index.sqlite"
+
+# Bump whenever the schema changes, stale indices are rebuilt from disk.
+SCHEMA_VERSION = 2
+
+
+class Index:
+    """Index is an on-disk manifest of the results stored in an `artifact_dir`.
+
+    The index is a SQLite database stored in `artifact_dir/.bocas/index.sqlite`.  It
+    records the name, config hash, flattened config, scalar metrics and files of each
+    result, so that questions like "which results exist" or "which results match this
+    filter" can be answered without parsing every `results.yaml`.
+
+    `bocas.run()` keeps the index up to date as results are written.  Results that
+    were added, changed or removed by other means are picked up by `refresh()`.
+
+    Usage:
+    ```python
+    index = bocas.Index("artifacts/")
+    index.refresh()
+    for row in index.query(model_type="resnet50"):
+        print(row["name"], row["metrics"]["eval_metrics/accuracy"])
+    ```
+
+    Args:
+        artifact_dir: the directory holding the results.
+        in_memory: whether to keep the index in memory instead of in
+            `artifact_dir/.bocas/index.sqlite`.  Defaults to `False`.  SQLite's
+            locking can't be relied upon on network filesystems, so the nodes of a
+            distributed sweep build their own index with `refresh()` instead of
+            sharing one.
+    """
+
+    def __init__(self, artifact_dir, in_memory=False):
+        self.artifact_dir = artifact_dir
+        if in_memory:
+            self.path = ":memory:"
+        else:
+            os.makedirs(os.path.join(artifact_dir, INDEX_DIR), exist_ok=True)
+            self.path = os.path.join(artifact_dir, INDEX_DIR, INDEX_FILE)
+        # `bocas.run()` updates the index from its background writer thread.
+        self.connection = sqlite3.connect(
+            self.path, timeout=60, check_same_thread=False
+        )
+        self._create_tables()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def update(self, result_dir, result=None):
+        """Adds (or replaces) the entry for the result stored in `result_dir`.
+
+        Args:
+            result_dir: directory holding the result.
+            result: (Optional) the `bocas.Result` stored in `result_dir`.  If not
+                provided, it is loaded from disk.
+        """
+        if result is None:
+            result = Result.load(result_dir)
+        name = os.path.basename(os.path.normpath(result_dir))
+        entry = _read_cache_entry(result_dir)
+        config_hash = entry.get("config_hash") or cache.config_hash(result.config or {})
+        row = (
+            name,
+            config_hash,
+            entry.get("task_fingerprint"),
+            entry.get("pruned_by"),
+            to_json(flatten_config(result.config)),
+            to_json(scalar_metrics(result)),
+            json.dumps(_file_signatures(result_dir)),
+        )
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)", row
+            )
+
+    def remove(self, name):
+        with self.connection:
+            self.connection.execute("DELETE FROM results WHERE name = ?", (name,))
+
+    def refresh(self, on_change=None):
+        """Brings the index in sync with the result directories on disk.
+
+        Only results whose files were added or modified since they were indexed are
+        parsed.
+
+        Args:
+            on_change: (Optional) callable invoked with the name and the loaded
+                `bocas.Result` of every result that was added or updated.
+
+        Returns:
+            the names of the results that were added or updated.
+        """
+        indexed = {
+            name: json.loads(files)
+            for name, files in self.connection.execute(
+                "SELECT name, files FROM results"
+            )
+        }
+        changed = []
+        on_disk = set()
+        for entry in os.scandir(self.artifact_dir):
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            on_disk.add(entry.name)
+            signatures = _file_signatures(entry.path)
+            if not any(f in signatures for f in cache.RESULT_FILES):
+                continue
+            if indexed.get(entry.name) == signatures:
+                continue
+            try:
+                result = Result.load(entry.path)
+                self.update(entry.path, result)
+            except Exception:
+                # Unreadable results are left out of the index, and retried on the
+                # next refresh.
+                self.remove(entry.name)
+                continue
+            changed.append(entry.name)
+            if on_change is not None:
+                on_change(entry.name, result)
+
+        for name in set(indexed) - on_disk:
+            self.remove(name)
+        return changed
+
+    def query(self, where=None, **conditions):
+        """Returns the indexed entries matching all of the given conditions.
+
+        Conditions are expressed like in `bocas.ResultCollection.filter()`: each
+        config key (i.e. `model_type`) or metric (i.e. `eval_metrics/accuracy`) is
+        mapped to either a value, or a callable that returns whether a value matches.
+
+        Returns:
+            a list of dictionaries with the keys `name`, `path`, `config_hash`,
+            `task_fingerprint`, `pruned_by`, `config` and `metrics`.  `pruned_by`
+            is the `state_id()` of the scheduler that stopped the config early, or
+            `None`.
+        """
+        conditions = {**(where or {}), **conditions}
+        rows = []
+        for (
+            name,
+            config_hash,
+            fingerprint,
+            pruned_by,
+            config,
+            metrics,
+        ) in self.connection.execute(
+            "SELECT name, config_hash, task_fingerprint, pruned_by, config, metrics "
+            "FROM results ORDER BY name"
+        ):
+            row = {
+                "name": name,
+                "path": os.path.join(self.artifact_dir, name),
+                "config_hash": config_hash,
+                "task_fingerprint": fingerprint,
+                "pruned_by": pruned_by,
+                "config": json.loads(config),
+                "metrics": json.loads(metrics),
+            }
+            if _matches({**row["config"], **row["metrics"]}, conditions):
+                rows.append(row)
+        return rows
+
+    def names(self):
+        """Returns the names of every indexed result."""
+        return [name for (name,) in self.connection.execute("SELECT name FROM results")]
+
+    def paths(self, where=None, **conditions):
+        """Returns the directories of the results matching the given conditions."""
+        return [row["path"] for row in self.query(where, **conditions)]
+
+    def _create_tables(self):
+        (version,) = self.connection.execute("PRAGMA user_version").fetchone()
+        with self.connection:
+            if version != SCHEMA_VERSION:
+                self.connection.execute("DROP TABLE IF EXISTS results")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "name TEXT PRIMARY KEY, "
+                "config_hash TEXT, "
+                "task_fingerprint TEXT, "
+                "pruned_by TEXT, "
+                "config TEXT, "
+                "metrics TEXT, "
+                "files TEXT)"
+            )
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _read_cache_entry(result_dir):
+    path = os.path.join(result_dir, cache.CACHE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _file_signatures(result_dir):
+    """Maps each top level file in `result_dir` to `[mtime_ns, size]`.
+
+    Hidden files, like the temporary files of in-progress writes, are ignored.
+    """
+    signatures = {}
+    for entry in os.scandir(result_dir):
+        if entry.is_file() and not entry.name.startswith("."):
+            stat = entry.stat()
+            signatures[entry.name] = [stat.st_mtime_ns, stat.st_size]
+    return signatures
+
+
+def _matches(values, conditions):
+    for key, condition in conditions.items():
+        if key not in values:
+            return False
+        value = values[key]
+        if callable(condition):
+            if not condition(value):
+                return False
+        elif value != normalize(condition):
+            return False
+    return True
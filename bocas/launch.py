@@ -5,6 +5,7 @@ from absl import flags
 from ml_collections import config_flags
 
 import bocas
+from bocas import server
 
 
 def launch():
@@ -12,12 +13,156 @@ def launch():
 
     flags.DEFINE_string("task", None, "the path to `run.py`.")
     config_flags.DEFINE_config_file("config")
+    flags.DEFINE_string(
+        "artifact_dir", "artifacts", "directory to write experiment results to."
+    )
+    flags.DEFINE_integer(
+        "max_workers",
+        None,
+        "number of worker processes to run configs in.  Runs in-process by default.",
+    )
+    flags.DEFINE_integer(
+        "max_configs_per_worker",
+        None,
+        "number of configs a worker process runs before it is recycled.",
+    )
+    flags.DEFINE_bool(
+        "use_cache", True, "skip configs that already have a result in artifact_dir."
+    )
+    flags.DEFINE_bool("force", False, "re-run every config, ignoring cached results.")
+    flags.DEFINE_bool(
+        "cprofile", False, "write `cProfile` stats to each result's directory."
+    )
+    flags.DEFINE_bool(
+        "distributed",
+        False,
+        "share the sweep with every other launch using the same artifact_dir.",
+    )
+    flags.DEFINE_float(
+        "lease_timeout",
+        300,
+        "seconds after which configs claimed by an unresponsive node are reclaimed.",
+    )
+    flags.DEFINE_enum(
+        "scheduler",
+        None,
+        ["successive_halving", "hyperband"],
+        "stop underperforming configs early, based on `bocas.report()` metrics.",
+    )
+    flags.DEFINE_string(
+        "scheduler_metric", None, "reported metric the scheduler compares configs on."
+    )
+    flags.DEFINE_enum(
+        "scheduler_mode", "max", ["max", "min"], "whether to maximize the metric."
+    )
+    flags.DEFINE_integer("scheduler_min_step", 1, "step of the scheduler's first rung.")
+    flags.DEFINE_integer(
+        "scheduler_reduction_factor", 3, "only 1 / factor configs pass each rung."
+    )
+    flags.DEFINE_enum(
+        "order",
+        "sweep",
+        ["sweep", "longest_first"],
+        "launch configs in sweep order, or those predicted to take longest first.",
+    )
+    flags.DEFINE_bool(
+        "dry_run",
+        False,
+        "print the number of configs and their predicted run time, then exit.",
+    )
+    flags.DEFINE_enum(
+        "search",
+        None,
+        ["random", "sobol", "adaptive"],
+        "strategy drawing the values of `bocas.Distribution`s in the config.",
+    )
+    flags.DEFINE_integer("search_budget", None, "number of configs to draw.")
+    flags.DEFINE_integer("search_seed", 0, "seed of the search's draws.")
+    flags.DEFINE_string(
+        "search_metric", None, "metric optimized by `--search=adaptive`."
+    )
+    flags.DEFINE_enum(
+        "search_mode", "max", ["max", "min"], "whether to maximize the metric."
+    )
+    flags.DEFINE_bool(
+        "server",
+        False,
+        "submit the sweep to the warm workers of `python -m bocas.serve`.",
+    )
+    flags.DEFINE_string(
+        "server_address",
+        None,
+        "path of the server's socket, defaults to a directory private to the user.",
+    )
 
     flags.mark_flag_as_required("task")
     flags.mark_flag_as_required("config")
 
     FLAGS(sys.argv)
-    bocas.run(FLAGS.task, FLAGS.config)
+    scheduler = None
+    if FLAGS.scheduler is not None:
+        if FLAGS.scheduler_metric is None:
+            raise ValueError("`--scheduler` requires `--scheduler_metric`.")
+        scheduler_type = {
+            "successive_halving": bocas.SuccessiveHalving,
+            "hyperband": bocas.Hyperband,
+        }[FLAGS.scheduler]
+        scheduler = scheduler_type(
+            FLAGS.scheduler_metric,
+            mode=FLAGS.scheduler_mode,
+            min_step=FLAGS.scheduler_min_step,
+            reduction_factor=FLAGS.scheduler_reduction_factor,
+        )
+    search = None
+    if FLAGS.search is not None:
+        if FLAGS.search_budget is None:
+            raise ValueError("`--search` requires `--search_budget`.")
+        if FLAGS.search == "adaptive":
+            if FLAGS.search_metric is None:
+                raise ValueError("`--search=adaptive` requires `--search_metric`.")
+            search = bocas.AdaptiveSweep(
+                FLAGS.search_metric,
+                FLAGS.search_budget,
+                mode=FLAGS.search_mode,
+                seed=FLAGS.search_seed,
+            )
+        else:
+            search_type = {"random": bocas.RandomSweep, "sobol": bocas.SobolSweep}[
+                FLAGS.search
+            ]
+            search = search_type(FLAGS.search_budget, seed=FLAGS.search_seed)
+    if FLAGS.server and not FLAGS.dry_run:
+        server.submit(
+            FLAGS.task,
+            FLAGS.config,
+            address=FLAGS.server_address,
+            artifact_dir=FLAGS.artifact_dir,
+            use_cache=FLAGS.use_cache,
+            force=FLAGS.force,
+            cprofile=FLAGS.cprofile,
+            distributed=FLAGS.distributed,
+            lease_timeout=FLAGS.lease_timeout,
+            scheduler=scheduler,
+            order=FLAGS.order,
+            search=search,
+        )
+        return
+    bocas.run(
+        FLAGS.task,
+        FLAGS.config,
+        artifact_dir=FLAGS.artifact_dir,
+        max_workers=FLAGS.max_workers,
+        max_configs_per_worker=FLAGS.max_configs_per_worker,
+        use_cache=FLAGS.use_cache,
+        force=FLAGS.force,
+        cprofile=FLAGS.cprofile,
+        distributed=FLAGS.distributed,
+        lease_timeout=FLAGS.lease_timeout,
+        scheduler=scheduler,
+        order=FLAGS.order,
+        search=search,
+        dry_run=FLAGS.dry_run,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+"""Prints (or processes) the results of a sweep as they are written.
+
+Usage:
+```
+python -m bocas.monitor --artifact_dir=artifacts/
+python -m bocas.monitor --artifact_dir=artifacts/ --callback=scripts/plots.py:update
+```
+"""
+
+import sys
+
+from absl import flags
+from termcolor import cprint
+
+import bocas
+from bocas.importing import import_file
+from bocas.summary import scalar_metrics
+
+
+def monitor():
+    FLAGS = flags.FLAGS
+
+    flags.DEFINE_string("artifact_dir", "artifacts", "directory to watch.")
+    flags.DEFINE_string(
+        "callback",
+        None,
+        "`path/to/script.py:function` to call with each `WatchUpdate`.  By default, "
+        "the scalar metrics of each new result are printed.",
+    )
+    flags.DEFINE_float("interval", 5.0, "seconds between polls.")
+
+    FLAGS(sys.argv)
+    callback = _print_update
+    if FLAGS.callback is not None:
+        callback = _load_callback(FLAGS.callback)
+    bocas.watch(FLAGS.artifact_dir, callback, interval=FLAGS.interval)
+
+
+def _load_callback(spec):
+    path, _, name = spec.rpartition(":")
+    if not path:
+        raise ValueError(
+            f"Expected `--callback` to be `path/to/script.py:function`, got {spec}"
+        )
+    return getattr(import_file(path), name)
+
+
+def _print_update(update):
+    for result in update.changed:
+        metrics = ", ".join(f"{k}={v}" for k, v in scalar_metrics(result).items())
+        cprint(f"{result.name}: {metrics}", "green")
+    for name in update.removed:
+        cprint(f"{name}: removed", "yellow")
+    cprint(f"{len(update.watcher.results)} results", attrs=["bold"])
+
+
+if __name__ == "__main__":
+    monitor()
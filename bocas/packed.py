@@ -0,0 +1,171 @@
+import io
+import os
+import pickle
+import tempfile
+import zipfile
+
+from bocas import cache
+from bocas import profiling
+from bocas import yamlify
+from bocas.result import _attach_profile
+
+
+def pack_collection(path, out):
+    """Packs the results stored in the subdirectories of `path` into a zip archive.
+
+    Each file of a result is stored as `<result name>/<file>`.  YAML files are
+    compressed, while `.npy` sidecars are stored as they are.  The archive's central
+    directory serves as its index, so a single result can later be read by seeking
+    to its members, without decompressing the rest of the archive.
+
+    Returns:
+        the names of the packed results.
+    """
+    names = []
+    out_dir = os.path.dirname(os.path.abspath(out))
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, prefix=".pack.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f, zipfile.ZipFile(f, "w") as archive:
+            for entry in sorted(os.scandir(path), key=lambda e: e.name):
+                if not entry.is_dir() or entry.name.startswith("."):
+                    continue
+                if not any(
+                    os.path.exists(os.path.join(entry.path, name))
+                    for name in cache.RESULT_FILES
+                ):
+                    continue
+                _pack_result(archive, entry.path, entry.name)
+                names.append(entry.name)
+        os.replace(tmp_path, out)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return names
+
+
+def _pack_result(archive, result_dir, name):
+    for root, dirs, files in os.walk(result_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for filename in sorted(files):
+            if filename.startswith("."):
+                continue
+            file_path = os.path.join(root, filename)
+            relative_path = os.path.relpath(file_path, result_dir)
+            arcname = "/".join([name, *relative_path.split(os.sep)])
+            compression = (
+                zipfile.ZIP_STORED
+                if filename.endswith(".npy")
+                else zipfile.ZIP_DEFLATED
+            )
+            archive.write(file_path, arcname, compress_type=compression)
+
+
+class PackedCollection:
+    """PackedCollection reads results from an archive made by `pack_collection()`.
+
+    Only the members of the requested result are read and decompressed.  A
+    `PackedCollection` may be passed to worker processes: each process re-opens the
+    archive.
+
+    Usage:
+    ```python
+    with PackedCollection("paper/artifacts.zip") as collection:
+        result = collection.load("model=resnet50-augmenter=basic")
+    ```
+
+    Args:
+        path: path to the archive.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._archive = None
+
+    @property
+    def archive(self):
+        if self._archive is None:
+            self._archive = zipfile.ZipFile(self.path, "r")
+        return self._archive
+
+    def names(self):
+        """Returns the names of the results in the archive."""
+        names = []
+        for member in self.archive.namelist():
+            name, _, filename = member.partition("/")
+            if filename in cache.RESULT_FILES and name not in names:
+                names.append(name)
+        return names
+
+    def read(self, name, filename):
+        """Returns the contents of `filename` in the result `name`, as bytes."""
+        return self.archive.read(f"{name}/{filename}")
+
+    def load(self, name, artifacts=None):
+        """Loads the result `name`, like `bocas.Result.load()` does from disk."""
+        source = _PackedResult(self, name)
+        if self._contains(name, "results.p"):
+            result = pickle.loads(self.read(name, "results.p"))
+        elif self._contains(name, "results.yaml"):
+            result = source.load_artifact("results.yaml", artifacts=artifacts)
+        else:
+            raise FileNotFoundError(
+                f"Found no `results.yaml` or `results.p` for {name} in {self.path}"
+            )
+
+        if self._contains(name, profiling.PROFILE_FILE):
+            _attach_profile(result, source, artifacts)
+        return result
+
+    def __call__(self, name):
+        return self.load(name)
+
+    def __iter__(self):
+        return (self.load(name) for name in self.names())
+
+    def __len__(self):
+        return len(self.names())
+
+    def close(self):
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getstate__(self):
+        # Open archives can't be pickled, worker processes open their own.
+        return {"path": self.path, "_archive": None}
+
+    def _contains(self, name, filename):
+        try:
+            self.archive.getinfo(f"{name}/{filename}")
+        except KeyError:
+            return False
+        return True
+
+
+class _PackedResult:
+    """Loads the artifacts referenced by a result, from a `PackedCollection`."""
+
+    def __init__(self, collection, name):
+        self.collection = collection
+        self.name = name
+
+    def load_artifact(self, path, artifacts=None):
+        return yamlify.load(
+            self.collection.read(self.name, path).decode("utf-8"),
+            sidecar_reader=self.read_array,
+            artifact_source=self,
+            artifacts=artifacts,
+        )
+
+    def read_array(self, path):
+        import numpy as np
+
+        data = self.collection.read(self.name, path)
+        return np.load(io.BytesIO(data), allow_pickle=False)
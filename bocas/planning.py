@@ -0,0 +1,144 @@
+import collections
+import heapq
+import numbers
+import statistics
+
+from termcolor import cprint
+
+from bocas.summary import flatten_config, normalize
+
+WALL_TIME_METRIC = "profile/wall_time"
+
+ORDERS = ("sweep", "longest_first")
+
+Plan = collections.namedtuple(
+    "Plan", ["jobs", "positions", "estimates", "cached", "total", "makespan", "longest"]
+)
+Plan.__doc__ = """The order a sweep is run in, and its predicted cost.
+
+`jobs` are in the order they are launched, and `positions` holds the position of
+each of them in the sweep.  `estimates` holds the predicted wall time of each job,
+in seconds, which is 0 for cached ones.  `total`, `makespan` (the predicted wall
+time of the whole sweep) and `longest` are `None` when there is no history to
+estimate from.
+"""
+
+
+class CostModel:
+    """Estimates the wall time of configs from the profiles of past results.
+
+    A config is estimated by the median wall time of the past results whose
+    configs share the most values with it.  Any result indexed in the
+    `artifact_dir` serves as history, see `bocas.Index`.
+
+    Args:
+        rows: rows of `bocas.Index.query()`.
+    """
+
+    def __init__(self, rows):
+        self.history = [
+            (row["config"], row["metrics"][WALL_TIME_METRIC])
+            for row in rows
+            if isinstance(row["metrics"].get(WALL_TIME_METRIC), numbers.Number)
+        ]
+
+    def estimate(self, config):
+        """Returns the predicted wall time of `config`, or `None` without history."""
+        if not self.history:
+            return None
+        # Configs round-trip through JSON in the index.
+        config = normalize(flatten_config(config))
+        best_similarity, wall_times = -1, []
+        for past_config, wall_time in self.history:
+            similarity = sum(
+                1
+                for key, value in config.items()
+                if key in past_config and past_config[key] == value
+            )
+            if similarity > best_similarity:
+                best_similarity, wall_times = similarity, [wall_time]
+            elif similarity == best_similarity:
+                wall_times.append(wall_time)
+        return statistics.median(wall_times)
+
+
+def plan(jobs, cost_model, workers=1, order="longest_first"):
+    """Orders `jobs` and predicts the wall time of running them on `workers`.
+
+    With `order="longest_first"`, the configs predicted to take longest are
+    launched first, so that no long config is left running alone at the end of a
+    parallel sweep.
+
+    Args:
+        jobs: `(config, config_hash, cached_dir)` tuples, in sweep order.
+        cost_model: a `CostModel`.
+        workers: number of configs run concurrently.
+        order: either "sweep" or "longest_first".
+
+    Returns:
+        a `Plan`.
+    """
+    if order not in ORDERS:
+        raise ValueError(f"Expected `order` to be one of {ORDERS}, got order={order}")
+    jobs = list(jobs)
+    estimates = [
+        0.0 if cached_dir is not None else cost_model.estimate(config)
+        for config, _, cached_dir in jobs
+    ]
+    positions = list(range(len(jobs)))
+    if order == "longest_first":
+        # `sort()` is stable, so configs without an estimate keep the sweep order.
+        positions.sort(key=lambda i: -(estimates[i] or 0.0))
+
+    total = makespan = longest = None
+    if jobs and all(estimate is not None for estimate in estimates):
+        total = sum(estimates)
+        longest = max(estimates)
+        makespan = _makespan([estimates[i] for i in positions], workers)
+    return Plan(
+        jobs=[jobs[i] for i in positions],
+        positions=positions,
+        estimates=[estimates[i] for i in positions],
+        cached=sum(1 for _, _, cached_dir in jobs if cached_dir is not None),
+        total=total,
+        makespan=makespan,
+        longest=longest,
+    )
+
+
+def print_plan(plan, workers=1):
+    """Prints the cardinality and predicted cost of a `Plan`."""
+    cprint(
+        f"{len(plan.jobs)} configs, {plan.cached} cached, "
+        f"{len(plan.jobs) - plan.cached} to run on {workers} worker(s).",
+        "green",
+    )
+    if plan.total is None:
+        cprint("No past results with a profile to estimate wall times from.", "yellow")
+        return
+    cprint(f"Predicted total task time: {_format_seconds(plan.total)}.", "green")
+    cprint(
+        f"Predicted wall time: {_format_seconds(plan.makespan)} "
+        f"(longest config: {_format_seconds(plan.longest)}).",
+        "green",
+    )
+
+
+def _makespan(estimates, workers):
+    """Simulates workers taking the next config in order as soon as they are free."""
+    finish_times = [0.0] * max(1, workers)
+    for estimate in estimates:
+        heapq.heappush(finish_times, heapq.heappop(finish_times) + estimate)
+    return max(finish_times)
+
+
+def _format_seconds(seconds):
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    hours, rest = divmod(int(round(seconds)), 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m{seconds:02d}s"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
@@ -0,0 +1,100 @@
+import contextlib
+import cProfile
+import os
+import resource
+import sys
+import time
+
+from bocas import yamlify
+from bocas.artifacts import Profile
+from bocas.writer import atomic_write
+
+PROFILE_FILE = "profile.yaml"
+PROFILE_NAME = "profile"
+CPROFILE_FILE = "profile.prof"
+
+_PROC_CLEAR_REFS = "/proc/self/clear_refs"
+_PROC_STATUS = "/proc/self/status"
+
+
+@contextlib.contextmanager
+def profile_task(config, cprofile=False, hooks=None):
+    """Measures the resources used within the context.
+
+    Yields a `bocas.artifacts.Profile` that is filled in when the context exits.
+
+    Args:
+        config: the config being run, passed to each hook.
+        cprofile: whether to run `cProfile` within the context.  The resulting
+            `cProfile.Profile` is stored in the `cprofile` attribute of the yielded
+            `Profile`.
+        hooks: (Optional) list of callables, each accepting the config and returning
+            a context manager to enter around the task.  If a context manager yields
+            a dictionary, its contents are added to the profile once it exits.
+    """
+    profile = Profile()
+    profile.cprofile = cProfile.Profile() if cprofile else None
+    reset_peak_rss()
+
+    with contextlib.ExitStack() as stack:
+        hook_values = [stack.enter_context(hook(config)) for hook in hooks or []]
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profile.cprofile is not None:
+            profile.cprofile.enable()
+        try:
+            yield profile
+        finally:
+            if profile.cprofile is not None:
+                profile.cprofile.disable()
+            profile.metrics["wall_time"] = time.perf_counter() - wall_start
+            profile.metrics["cpu_time"] = time.process_time() - cpu_start
+            profile.metrics["peak_rss"] = peak_rss()
+
+    for values in hook_values:
+        if isinstance(values, dict):
+            profile.metrics.update(values)
+
+
+def dump_cprofile(profile, result_dir):
+    """Writes the `cProfile` stats held by `profile`, if any, to `result_dir`."""
+    if getattr(profile, "cprofile", None) is None:
+        return
+    os.makedirs(result_dir, exist_ok=True)
+    profile.cprofile.dump_stats(os.path.join(result_dir, CPROFILE_FILE))
+    profile.cprofile = None
+
+
+def write_profile(profile, result_dir):
+    atomic_write(os.path.join(result_dir, PROFILE_FILE), yamlify.dump(profile))
+
+
+def result_files_size(result_dir):
+    size = 0
+    for root, _, files in os.walk(result_dir):
+        size += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return size
+
+
+def reset_peak_rss():
+    """Resets the peak resident set size of this process, where supported."""
+    # Linux allows resetting the peak resident set size (VmHWM) of a process.
+    try:
+        with open(_PROC_CLEAR_REFS, "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss():
+    """Returns the peak resident set size of this process, in bytes."""
+    try:
+        with open(_PROC_STATUS, "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # `ru_maxrss` is reported in bytes on macOS, and in kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -1,14 +1,20 @@
+import collections
+import functools
 import glob
+import itertools
+import warnings
+from concurrent import futures
 from termcolor import colored, cprint
 import os
 import pickle
-import yaml
-from bocas.artifacts import Artifact
-from bocas.yamlify import (
-    configure_custom_yaml,
-)
+from bocas import cache
+from bocas import profiling
+from bocas import slots
+from bocas import yamlify
+from bocas.artifacts import Artifact, LazyArtifact
 
-configure_custom_yaml()
+LoadFailure = collections.namedtuple("LoadFailure", ["path", "error"])
+LoadFailure.__doc__ = "Records a result directory that failed to load, and why."
 
 
 class Result:
@@ -33,6 +39,8 @@ class Result:
             result.
     """
 
+    __slots__ = ("name", "artifacts", "config", "_artifact_index")
+
     def __init__(self, name, artifacts=None, config=None):
         if not _all_artifacts(artifacts):
             raise ValueError(
@@ -45,43 +53,214 @@ class Result:
         self.name = name
         self.artifacts = artifacts or []
         self.config = config
+        self._artifact_index = {}
+
+    def __getstate__(self):
+        return slots.get_state(self, exclude=("_artifact_index",))
+
+    def __setstate__(self, state):
+        slots.set_state(self, state)
+        self._artifact_index = {}
 
     def get(self, name):
-        for artifact in self.artifacts:
-            if artifact.name == name:
-                return artifact
+        # `artifacts` is a plain list that callers may modify, so the index of
+        # artifact positions is validated on every hit and rebuilt on a miss.
+        position = self._artifact_index.get(name)
+        if position is None or not self._indexed_at(name, position):
+            self._artifact_index = {}
+            for i, artifact in enumerate(self.artifacts):
+                self._artifact_index.setdefault(artifact.name, i)
+            position = self._artifact_index.get(name)
+        if position is not None:
+            artifact = self.artifacts[position]
+            if isinstance(artifact, LazyArtifact):
+                artifact = artifact.materialize()
+                self.artifacts[position] = artifact
+            return artifact
         raise ValueError(
             f"Didn't find an artifact with name `name={name}`. "
             "Instead, found artifacts with the following names: "
             f"[{', '.join([a.name for a in self.artifacts])}]"
         )
 
+    def _indexed_at(self, name, position):
+        return position < len(self.artifacts) and self.artifacts[position].name == name
+
     @staticmethod
-    def load(path):
+    def load(path, artifacts=None):
+        """Loads the result stored in the directory `path`.
+
+        Usage:
+        ```python
+        result = bocas.Result.load(path, artifacts=["eval_metrics"])
+        result.get("eval_metrics")  # loaded
+        result.get("fit_history")  # loaded on first access
+        ```
+
+        Args:
+            path: the result directory.
+            artifacts: (Optional) names of the artifacts to load.  The other
+                artifacts are returned as `bocas.artifacts.LazyArtifact`, which load
+                on first access.  Defaults to `None`, which loads every artifact.
+                Results written by older versions of `bocas` are always loaded
+                whole.
+        """
+        source = ResultDirectory(path)
         # Maintain backwards compatibility with pickled results
         if os.path.exists(os.path.join(path, "results.p")):
             with open(os.path.join(path, "results.p"), "rb") as f:
                 result = pickle.load(f)
         elif os.path.exists(os.path.join(path, "results.yaml")):
             with open(os.path.join(path, "results.yaml"), "r") as f:
-                result = yaml.load(f, Loader=yaml.FullLoader)
+                result = yamlify.load(
+                    f, sidecar_dir=path, artifact_source=source, artifacts=artifacts
+                )
+        else:
+            raise FileNotFoundError(f"Found no `results.yaml` or `results.p` in {path}")
+
+        # `bocas.run()` stores the `Profile` of each result next to it
+        if os.path.exists(os.path.join(path, profiling.PROFILE_FILE)):
+            _attach_profile(result, source, artifacts)
 
         return result
 
     @staticmethod
-    def load_collection(path):
-        results = []
-        for path in glob.glob(f"{path}/*/"):
-            try:
-                r = Result.load(path)
-                results.append(r)
-            except Exception as e:
-                cprint(
-                    colored("Error loading result:", "red", attrs=["bold"]) + " " + path
+    def pack_collection(path, out):
+        """Packs every result of an `artifact_dir` into the single archive `out`.
+
+        Packed collections are faster to copy between machines and to load than
+        thousands of small files.  Pass the archive to `load_collection()`,
+        `iter_collection()` or `bocas.packed.PackedCollection` to read it back.
+
+        Usage:
+        ```python
+        bocas.Result.pack_collection("artifacts/", "paper/artifacts.zip")
+        results = bocas.Result.load_collection("paper/artifacts.zip")
+        ```
+
+        Returns:
+            the names of the packed results.
+        """
+        from bocas.packed import pack_collection
+
+        return pack_collection(path, out)
+
+    @staticmethod
+    def load_collection(path, where=None, compact=False, artifacts=None):
+        return list(
+            Result.iter_collection(
+                path,
+                where=where,
+                on_error=_print_load_failure,
+                compact=compact,
+                artifacts=artifacts,
+            )
+        )
+
+    @staticmethod
+    def iter_collection(
+        path,
+        where=None,
+        workers=None,
+        on_error=None,
+        compact=False,
+        artifacts=None,
+    ):
+        """Yields the results stored in the subdirectories of `path` as they load.
+
+        Subdirectories without a result file, like those of configs that are still
+        running or were interrupted, are skipped.
+
+        Usage:
+        ```python
+        failures = []
+        for result in bocas.Result.iter_collection(
+            "artifacts/", on_error=failures.append
+        ):
+            ...
+        ```
+
+        Args:
+            path: the `artifact_dir` of a sweep, or a collection packed by
+                `bocas.Result.pack_collection()`.
+            where: (Optional) dictionary of conditions, as accepted by
+                `bocas.Index.query()`.  When provided, matching results are looked
+                up in the index of `path`, and only those results are loaded.
+            workers: (Optional) number of processes to load results with.
+                Defaults to `None`, which loads results one at a time in this
+                process.  Parsing is bound by the GIL, so a pool only pays off for
+                large results.  Results are yielded in the same order either way,
+                and at most `2 * workers` results are in flight at once.
+            on_error: (Optional) callable invoked with a `bocas.result.LoadFailure`
+                for every result that fails to load.  Defaults to issuing a warning.
+            compact: whether to reduce the memory held by the loaded results, see
+                `bocas.compaction.Compactor`.  Compacted results share their static
+                config sections, and should be treated as read-only.
+            artifacts: (Optional) names of the artifacts to load, see
+                `bocas.Result.load()`.
+        """
+        on_error = on_error or _warn_load_failure
+        if compact:
+            from bocas.compaction import Compactor
+
+            compactor = Compactor()
+            results = Result.iter_collection(
+                path, where, workers, on_error, artifacts=artifacts
+            )
+            yield from (compactor.compact(result) for result in results)
+            return
+
+        load = functools.partial(Result.load, artifacts=artifacts)
+        if os.path.isfile(path):
+            # A collection packed by `Result.pack_collection()`.
+            from bocas.packed import PackedCollection
+
+            if where is not None:
+                raise ValueError("`where` is not supported for packed collections.")
+            collection = PackedCollection(path)
+            load = functools.partial(collection.load, artifacts=artifacts)
+            paths = iter(collection.names())
+        elif where is None:
+            paths = (
+                result_dir
+                for result_dir in glob.iglob(f"{path}/*/")
+                if any(
+                    os.path.exists(os.path.join(result_dir, filename))
+                    for filename in cache.RESULT_FILES
                 )
-                print(e)
-                pass
-        return results
+            )
+        else:
+            from bocas.index import Index
+
+            with Index(path) as index:
+                index.refresh()
+                paths = iter(index.paths(where))
+
+        if workers is None:
+            for result_path in paths:
+                try:
+                    yield load(result_path)
+                except Exception as e:
+                    on_error(LoadFailure(result_path, e))
+            return
+
+        with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            # Futures are consumed in submission order, so results and errors come
+            # out in the same order as with `workers=None`.
+            in_flight = collections.deque(
+                (p, executor.submit(load, p))
+                for p in itertools.islice(paths, 2 * workers)
+            )
+            while in_flight:
+                result_path, future = in_flight.popleft()
+                for p in itertools.islice(paths, 1):
+                    in_flight.append((p, executor.submit(load, p)))
+                try:
+                    result = future.result()
+                except Exception as e:
+                    on_error(LoadFailure(result_path, e))
+                    continue
+                yield result
 
     def to_yaml(self):
         yaml_dict = {
@@ -117,8 +296,39 @@ def result_constructor(loader, node):
     return Result.from_yaml(loader, node)
 
 
-yaml.add_representer(Result, result_representer)
-yaml.add_constructor("!Result", result_constructor)
+yamlify.Dumper.add_representer(Result, result_representer)
+yamlify.Loader.add_constructor("!Result", result_constructor)
+
+
+def _print_load_failure(failure):
+    cprint(colored("Error loading result:", "red", attrs=["bold"]) + " " + failure.path)
+    print(failure.error)
+
+
+def _warn_load_failure(failure):
+    warnings.warn(f"Error loading result {failure.path}: {failure.error}")
+
+
+class ResultDirectory:
+    """Loads the artifacts referenced by a result, from its directory."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load_artifact(self, path):
+        with open(os.path.join(self.path, path), "r") as f:
+            return yamlify.load(f, sidecar_dir=self.path)
+
+
+def _attach_profile(result, source, artifacts=None):
+    """Attaches the `Profile` stored next to a result, loaded from `source`."""
+    name = profiling.PROFILE_NAME
+    if name in [a.name for a in result.artifacts]:
+        return
+    profile = LazyArtifact(name, profiling.PROFILE_FILE, source)
+    if artifacts is None or name in artifacts:
+        profile = profile.materialize()
+    result.artifacts.append(profile)
 
 
 def _all_artifacts(artifacts):
@@ -0,0 +1,263 @@
+import numbers
+
+import numpy as np
+
+from bocas.result import Result
+from bocas.summary import flatten_config, scalar_metrics
+
+
+class ResultCollection:
+    """ResultCollection is a columnar view over many `bocas.Result` objects.
+
+    Every config value and every scalar metric is flattened into a column, stored as
+    a `np.ndarray` with one entry per result.  Nested config values are named with
+    dots (i.e. `optimizer.learning_rate`), and metrics are named
+    `{artifact_name}/{metric_name}` (i.e. `eval_metrics/accuracy`).  Queries operate
+    on these columns instead of on each individual `Result`.
+
+    Usage:
+    ```python
+    results = bocas.ResultCollection.load("artifacts/")
+    resnets = results.filter(model_type="resnet50")
+    best = resnets.best("eval_metrics/accuracy")
+    curves = resnets.stack_history("fit_history", "val_accuracy")
+    ```
+
+    Args:
+        results: iterable of `bocas.Result`.
+    """
+
+    def __init__(self, results):
+        self.results = list(results)
+        rows = [result_row(result) for result in self.results]
+        self.config_keys, self.metric_keys, self.columns = _build_columns(rows)
+
+    @classmethod
+    def from_rows(cls, results, rows):
+        """Builds a collection from results along with their `result_row()`s.
+
+        Lets callers that hold on to rows, like `bocas.watch()`, skip flattening
+        results that haven't changed.
+        """
+        collection = cls.__new__(cls)
+        collection.results = list(results)
+        collection.config_keys, collection.metric_keys, collection.columns = (
+            _build_columns(rows)
+        )
+        return collection
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Loads a collection from an `artifact_dir`.
+
+        `kwargs` are passed to `bocas.Result.iter_collection()`.  Results are
+        compacted by default, pass `compact=False` to opt out.
+        """
+        kwargs.setdefault("compact", True)
+        return cls(Result.iter_collection(path, **kwargs))
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __getitem__(self, index):
+        return self.results[index]
+
+    def column(self, key):
+        """Returns the column for a config key or metric as a `np.ndarray`."""
+        if key not in self.columns:
+            raise ValueError(
+                f"Didn't find a column with name `key={key}`. Instead, found columns "
+                f"with the following names: [{', '.join(self.columns)}]"
+            )
+        return self.columns[key]
+
+    def take(self, indices):
+        """Returns a new `ResultCollection` holding the results at `indices`.
+
+        `indices` may either be integer indices or a boolean mask.
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        subset = ResultCollection.__new__(ResultCollection)
+        subset.results = [self.results[i] for i in indices]
+        subset.config_keys = self.config_keys
+        subset.metric_keys = self.metric_keys
+        subset.columns = {key: col[indices] for key, col in self.columns.items()}
+        return subset
+
+    def filter(self, where=None, **conditions):
+        """Returns the results matching all of the given conditions.
+
+        Usage:
+        ```python
+        results.filter(model_type="resnet50")
+        results.filter({"eval_metrics/accuracy": lambda acc: acc > 0.9})
+        ```
+
+        Args:
+            where: (Optional) dictionary mapping column names to conditions.  Use
+                this for column names that are not valid keyword arguments.
+            **conditions: column names mapped to conditions.  A condition is either
+                a value to compare against, or a callable that receives the full
+                column and returns a boolean mask.
+        """
+        conditions = {**(where or {}), **conditions}
+        mask = np.ones(len(self), dtype=bool)
+        for key, condition in conditions.items():
+            column = self.column(key)
+            if callable(condition):
+                mask &= np.asarray(condition(column), dtype=bool)
+            else:
+                mask &= _equals(column, condition)
+        return self.take(mask)
+
+    def group_by(self, key):
+        """Returns a dictionary mapping each value of `key` to a `ResultCollection`."""
+        codes, values = _factorize(self.column(key).tolist())
+        return {value: self.take(codes == i) for i, value in enumerate(values)}
+
+    def best(self, metric, mode="max"):
+        """Returns the `bocas.Result` with the best value of `metric`.
+
+        Args:
+            metric: name of a metric column, i.e. `eval_metrics/accuracy`.
+            mode: either "max" or "min".
+        """
+        if mode not in ("max", "min"):
+            raise ValueError(f"Expected `mode` to be 'max' or 'min', got mode={mode}")
+        column = self.column(metric).astype(float)
+        if np.all(np.isnan(column)):
+            raise ValueError(f"No result in the collection reports `{metric}`.")
+        index = np.nanargmax(column) if mode == "max" else np.nanargmin(column)
+        return self.results[index]
+
+    def aggregate(self, metric, over="seed"):
+        """Aggregates `metric` over repeated runs of the same config.
+
+        Results are grouped by every config key except `over`, and the mean,
+        standard deviation and count of `metric` are computed for each group.
+
+        Args:
+            metric: name of a metric column, i.e. `eval_metrics/accuracy`.
+            over: config key (or list of config keys) to aggregate over.  Defaults to
+                "seed".
+
+        Returns:
+            a list of dictionaries, one per group, holding the group's config values
+            along with `mean`, `std` and `count`.
+        """
+        over = [over] if isinstance(over, str) else list(over)
+        keys = [key for key in self.config_keys if key not in over]
+
+        columns = [self.columns[key].tolist() for key in keys]
+        rows = list(zip(*columns)) or [()] * len(self)
+        codes, groups = _factorize(rows)
+        values = self.column(metric).astype(float)
+        valid = ~np.isnan(values)
+
+        count = np.bincount(codes[valid], minlength=len(groups))
+        total = np.bincount(codes[valid], weights=values[valid], minlength=len(groups))
+        squares = np.bincount(
+            codes[valid], weights=values[valid] ** 2, minlength=len(groups)
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            std = np.sqrt(np.maximum(squares / count - mean**2, 0.0))
+
+        return [
+            {**dict(zip(keys, group)), "mean": m, "std": s, "count": c}
+            for group, m, s, c in zip(
+                groups, mean.tolist(), std.tolist(), count.tolist()
+            )
+        ]
+
+    def stack_history(self, artifact, key, pad_value=np.nan):
+        """Stacks a `KerasHistory` curve from every result into a single array.
+
+        Curves shorter than the longest one are padded with `pad_value`.
+
+        Args:
+            artifact: name of the `bocas.artifacts.KerasHistory` artifact.
+            key: name of the metric in the history, i.e. `val_accuracy`.
+            pad_value: value to pad shorter curves with.
+
+        Returns:
+            a `np.ndarray` of shape `(n_results, n_epochs)`.
+        """
+        curves = [r.get(artifact).history.get(key, ()) for r in self.results]
+        n_epochs = max([len(curve) for curve in curves], default=0)
+        stacked = np.full((len(curves), n_epochs), pad_value, dtype=float)
+        for i, curve in enumerate(curves):
+            stacked[i, : len(curve)] = curve
+        return stacked
+
+    def to_dataframe(self):
+        """Returns the columns of the collection as a `pandas.DataFrame`."""
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError(
+                "`ResultCollection.to_dataframe()` requires `pandas`.  "
+                "Install it with `pip install pandas`."
+            )
+        return pd.DataFrame(self.columns)
+
+
+def result_row(result):
+    """Returns the flattened config and scalar metrics of a result.
+
+    Returns:
+        a tuple of `(name, config, metrics)`.
+    """
+    return result.name, flatten_config(result.config), scalar_metrics(result)
+
+
+def _build_columns(result_rows):
+    rows = []
+    config_keys = {}
+    metric_keys = {}
+    for name, config, metrics in result_rows:
+        config_keys.update(dict.fromkeys(config))
+        metric_keys.update(dict.fromkeys(metrics))
+        rows.append({"name": name, **config, **metrics})
+
+    columns = {"name": np.array([row["name"] for row in rows], dtype=object)}
+    for key in list(config_keys) + list(metric_keys):
+        columns[key] = _to_column([row.get(key) for row in rows])
+    return list(config_keys), list(metric_keys), columns
+
+
+def _to_column(values):
+    numeric = all(
+        isinstance(v, numbers.Number) and not isinstance(v, bool)
+        for v in values
+        if v is not None
+    )
+    if numeric and values and None not in values:
+        return np.asarray(values)
+    if numeric and any(v is not None for v in values):
+        return np.array([np.nan if v is None else v for v in values], dtype=float)
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _equals(column, value):
+    if isinstance(value, tuple):
+        return np.array([v == value for v in column], dtype=bool)
+    return np.asarray(column == value, dtype=bool)
+
+
+def _factorize(values):
+    """Returns integer codes for `values`, along with the unique values."""
+    uniques = {}
+    codes = np.fromiter(
+        (uniques.setdefault(v, len(uniques)) for v in values),
+        dtype=np.int64,
+        count=len(values),
+    )
+    return codes, list(uniques)
@@ -1,19 +1,42 @@
-import importlib
+import collections
+import contextlib
 import itertools
+import threading
+import time
+import multiprocessing
 import os
 import pickle
-import yaml
+import shutil
+import uuid
 from termcolor import cprint
 
-import ml_collections
+from bocas import cache
+from bocas import checkpoint
+from bocas import importing
+from bocas import planning
+from bocas import profiling
+from bocas import scheduler as scheduling
+from bocas import stages
+from bocas.artifacts import LazyArtifact
+from bocas.index import Index
+from bocas.result import Result
+from bocas.summary import scalar_metrics
+from bocas.sweep import Distribution, Sweep, Zip
+from bocas.work_queue import WorkQueue
+from bocas.writer import ResultWriter, atomic_write
+from bocas import yamlify
 
-from bocas.sweep import Sweep
-from bocas.yamlify import contains_only_registered_tags
+# Task callable and options used by pool workers, populated by `_init_worker()`.
+_worker_task = None
+_worker_options = None
+
+_ExecuteOptions = collections.namedtuple(
+    "_ExecuteOptions", ["artifact_dir", "cprofile", "profile_hooks", "scheduler"]
+)
 
 
 def _import_run_lib(path):
-    loader = importlib.machinery.SourceFileLoader("_run_task", path)
-    module = loader.load_module()
+    module = importing.import_file(path)
 
     if not hasattr(module, "run"):
         raise ValueError(
@@ -24,79 +47,863 @@ def _import_run_lib(path):
     return module
 
 
-def _iter_configs(config):
-    static_keys = {}
-    dynamic_keys = {}
+def _load_task(path):
+    if isinstance(path, str):
+        return _import_run_lib(path).run
+    return path
+
+
+def _iter_configs(config, constraints=None, search=None, observations=None):
+    """Lazily yields every config described by the `Sweep`s in `config`.
+
+    Configs rejected by any of the `constraints` are skipped.  If `config` holds
+    `bocas.Distribution`s, the product of sweeps is yielded once for each point
+    drawn by `search`, which is given `observations`, see `bocas.AdaptiveSweep`.
+    """
+    import ml_collections
+
+    template = _sweep_template(config)
+    paths, choices = _sweep_axes(config)
+    ranges = _find_ranges(config, search)
+    if ranges:
+        paths.append([path for path, _ in ranges])
+        points = search.points(len(ranges), observations)
+    else:
+        points = [()]
+
+    for point in points:
+        axes = choices
+        if ranges:
+            # The drawn values form one more axis, with a single choice.
+            drawn = tuple(dist.from_unit(u) for (_, dist), u in zip(ranges, point))
+            axes = choices + [[drawn]]
+        for selection in itertools.product(*axes):
+            result = _copy_along(template, paths)
+            for axis_paths, values in zip(paths, selection):
+                for path, value in zip(axis_paths, values):
+                    _set_path(result, path, value)
+            result = ml_collections.ConfigDict(initial_dictionary=result)
+            if all(constraint(result) for constraint in constraints or ()):
+                yield result
+
+
+def _find_ranges(config, search):
+    """Returns `(path, distribution)` for every `Distribution` in `config`."""
+    ranges = list(_find_sweeps(config, types=Distribution))
+    if ranges and search is None:
+        raise ValueError(
+            "Expected a `search` strategy, i.e. `bocas.RandomSweep`, to be passed "
+            "to `bocas.run()` to draw values of: "
+            + ", ".join(".".join(path) for path, _ in ranges)
+        )
+    if search is not None and not ranges:
+        raise ValueError(
+            "Expected `config` to contain `bocas.Distribution`s, i.e. "
+            "`bocas.Uniform`, for `search` to draw values from."
+        )
+    return ranges
+
+
+def _find_sweeps(config, prefix=(), types=Sweep):
+    """Yields `(path, sweep)` for every `Sweep` in `config`, at any depth.
 
+    `types` may select other values, i.e. `Distribution`s.
+    """
     for key in config:
-        if not isinstance(config[key], Sweep):
-            static_keys[key] = config[key]
-            continue
+        value = config[key]
+        if isinstance(value, types):
+            yield prefix + (key,), value
+        elif _is_mapping(value):
+            yield from _find_sweeps(value, prefix + (key,), types)
 
-        dynamic_keys[key] = config[key]
 
-    selections = []
-    for key in dynamic_keys:
-        selections.append([(key, val) for val in dynamic_keys[key].items])
+def _sweep_axes(config):
+    """Returns the paths swept by each axis of the product, and each axis' choices.
 
-    for selection in itertools.product(*selections):
-        result = static_keys.copy()
-        for key, val in selection:
-            result[key] = val
-        yield ml_collections.ConfigDict(initial_dictionary=result)
+    Every `Sweep` is its own axis, except `Zip` sweeps, which form one axis per
+    group.  An axis' choices are tuples holding one value per swept path.
+    """
+    axes = {}
+    for path, sweep in _find_sweeps(config):
+        key = ("zip", sweep.group) if isinstance(sweep, Zip) else path
+        axes.setdefault(key, []).append((path, sweep))
 
+    paths, choices = [], []
+    for key, sweeps in axes.items():
+        lengths = {len(sweep.items) for _, sweep in sweeps}
+        if len(lengths) > 1:
+            raise ValueError(
+                f"Expected every `bocas.Zip` in group `{key[1]}` to have the same "
+                "number of items, instead got: "
+                + ", ".join(f"{'.'.join(p)}={len(s.items)}" for p, s in sweeps)
+            )
+        paths.append([path for path, _ in sweeps])
+        choices.append(list(zip(*[sweep.items for _, sweep in sweeps])))
+    return paths, choices
 
-def run(path, config, artifact_dir="artifacts"):
-    config_values = config.to_dict()
-    # handle dynamic import
-    if isinstance(path, str):
-        module = _import_run_lib(path)
-        run = module.run
-    else:
-        run = path
 
+def _sweep_template(config):
+    """Converts the sections of `config` holding sweeps or ranges to dictionaries.
+
+    Sections without sweeps are kept as they are.
+    """
+    template = {}
+    for key in config:
+        value = config[key]
+        if _is_mapping(value) and any(
+            True for _ in _find_sweeps(value, types=(Sweep, Distribution))
+        ):
+            value = _sweep_template(value)
+        template[key] = value
+    return template
+
+
+def _copy_along(template, paths):
+    """Copies the dictionaries of `template` that lie on any of `paths`."""
+    result = dict(template)
+    prefixes = {
+        path[:i] for axis in paths for path in axis for i in range(1, len(path))
+    }
+    for prefix in sorted(prefixes, key=len):
+        parent = result
+        for key in prefix[:-1]:
+            parent = parent[key]
+        parent[prefix[-1]] = dict(parent[prefix[-1]])
+    return result
+
+
+def _get_path(config, path):
+    for key in path:
+        config = config[key]
+    return config
+
+
+def _set_path(config, path, value):
+    for key in path[:-1]:
+        config = config[key]
+    config[path[-1]] = value
+
+
+def _is_mapping(value):
+    return isinstance(value, dict) or hasattr(value, "to_dict")
+
+
+def run(
+    path,
+    config,
+    artifact_dir="artifacts",
+    max_workers=None,
+    max_configs_per_worker=None,
+    use_cache=True,
+    force=False,
+    cprofile=False,
+    profile_hooks=None,
+    constraints=None,
+    distributed=False,
+    lease_timeout=300,
+    poll_interval=10,
+    scheduler=None,
+    order="sweep",
+    search=None,
+    dry_run=False,
+):
+    """Runs the task found at `path` once for every config in the sweep.
+
+    Args:
+        path: path to a `run.py` file containing a `run()` method, or the `run()`
+            callable itself.
+        config: `ml_collections.ConfigDict` that may contain `bocas.Sweep` values.
+        artifact_dir: directory to write each result to, under
+            `artifact_dir/<result.name>`.
+        max_workers: (Optional) number of worker processes to dispatch configs to.
+            Defaults to `None`, which runs every config in the current process.
+        max_configs_per_worker: (Optional) number of configs each worker process
+            runs before it is replaced by a fresh process.  This caps the memory
+            growth of long sweeps.  Only used when `max_workers` is set.
+        use_cache: whether to skip configs that already have a result in
+            `artifact_dir`, produced by the same version of the task.  Defaults to
+            `True`.
+        force: if `True`, re-runs every config and overwrites any cached result.
+        cprofile: whether to run each task under `cProfile`.  The stats are written
+            to `profile.prof` in each result directory.
+        profile_hooks: (Optional) list of callables that accept a config and return
+            a context manager to enter around each task invocation, i.e. a custom
+            timer.  If a context manager yields a dictionary, its contents are
+            recorded in the result's `bocas.artifacts.Profile`.
+        constraints: (Optional) list of predicates, each accepting an expanded
+            config and returning whether it should be run.  Configs rejected by any
+            predicate are skipped before they are launched.
+        distributed: whether to share the sweep with every other `bocas.run()`
+            invocation running it with the same `artifact_dir`, i.e. on other
+            machines sharing a filesystem.  Each config is claimed through a lease
+            in `artifact_dir/.bocas/queue/` and run by exactly one of them.  Every
+            invocation returns once the whole sweep is done.  See
+            `bocas.work_queue.WorkQueue`.
+        lease_timeout: seconds after which the lease of a node that stopped
+            sending heartbeats is reclaimed.  Only used when `distributed` is set.
+        poll_interval: seconds to wait between checks on configs claimed by other
+            nodes.  Only used when `distributed` is set.
+        scheduler: (Optional) a `bocas.SuccessiveHalving` or `bocas.Hyperband`
+            scheduler, that stops underperforming configs early based on the
+            metrics they pass to `bocas.report()`.  Configs that are stopped still
+            get a result, named `pruned-<config hash>` unless the task catches
+            `bocas.Pruned` and returns its own.  Scheduled results hold a
+            `scheduler` artifact recording whether and when they were stopped, and
+            a `reports` artifact holding every reported metric.  Pruned results
+            are only reused by launches with the same scheduler.
+        order: either "sweep", to launch configs in the order they are expanded,
+            or "longest_first", to launch the configs predicted to take longest
+            first.  Predictions are based on the wall time of past results in
+            `artifact_dir` with similar configs, see `bocas.planning.CostModel`.
+            This shortens parallel sweeps that would otherwise end with a long
+            config running alone, but expands the whole sweep up front.
+        search: (Optional) a search strategy, i.e. `bocas.RandomSweep`,
+            `bocas.SobolSweep` or `bocas.AdaptiveSweep`, drawing the values of the
+            `bocas.Distribution`s in `config`, i.e. `bocas.Uniform`.  Each draw is
+            combined with the product of the `Sweep`s in `config`.
+            `bocas.AdaptiveSweep` is fed the results of completed configs, and
+            can't be combined with `distributed` or `order="longest_first"`.
+        dry_run: if `True`, prints the number of configs and their predicted total
+            and wall time, and returns the `bocas.planning.Plan` without running
+            anything.
+
+    Every result is given a `bocas.artifacts.Profile` artifact, recording the wall
+    time, CPU time and peak memory usage of the task, along with the time spent
+    writing the result and the size of the written files.
+
+    Returns:
+        a list of `bocas.Result`, in the order the configs were expanded.
+    """
+    _check_arguments(force, distributed, order, search)
+    if dry_run:
+        _, index, _, plan = _prepare_jobs(
+            path,
+            config,
+            artifact_dir,
+            use_cache,
+            force,
+            constraints,
+            order,
+            max_workers,
+            search=search,
+            dry_run=True,
+            distributed=distributed,
+            scheduler=scheduler,
+        )
+        index.close()
+        planning.print_plan(plan, workers=max_workers or 1)
+        return plan
+
+    results = _run(
+        path,
+        config,
+        artifact_dir=artifact_dir,
+        max_workers=max_workers,
+        max_configs_per_worker=max_configs_per_worker,
+        use_cache=use_cache,
+        force=force,
+        cprofile=cprofile,
+        profile_hooks=profile_hooks,
+        constraints=constraints,
+        distributed=distributed,
+        lease_timeout=lease_timeout,
+        poll_interval=poll_interval,
+        scheduler=scheduler,
+        order=order,
+        search=search,
+        stream=False,
+    )
+    # Results are yielded as they are written, restore the sweep order.
+    return [result for _, result in sorted(results, key=lambda r: r[0])]
+
+
+def run_iter(path, config, handles=False, **kwargs):
+    """Like `bocas.run()`, but yields each result as soon as it has been written.
+
+    Results are not accumulated, so memory usage stays flat regardless of the size
+    of the sweep.  They are yielded in the order they are written, which may differ
+    from the order the configs were expanded.
+
+    Usage:
+    ```python
+    for result in bocas.run_iter("run.py", config, max_workers=8, handles=True):
+        print(result.name, result.get("eval_metrics").metrics)
+    ```
+
+    Args:
+        path: path to a `run.py` file containing a `run()` method, or the `run()`
+            callable itself.
+        config: `ml_collections.ConfigDict` that may contain `bocas.Sweep` values.
+        handles: if `True`, yields lightweight handles instead of the results
+            returned by the task: each result is loaded back from disk with its
+            artifacts left as `bocas.artifacts.LazyArtifact`, loaded on first
+            access.
+        **kwargs: any other argument of `bocas.run()`, except `dry_run`.
+    """
+    _check_arguments(
+        kwargs.get("force", False),
+        kwargs.get("distributed", False),
+        kwargs.get("order", "sweep"),
+        kwargs.get("search"),
+    )
+    return (result for _, result in _run(path, config, handles=handles, **kwargs))
+
+
+def _check_arguments(force, distributed, order, search=None):
+    if order not in planning.ORDERS:
+        raise ValueError(
+            f"Expected `order` to be one of {planning.ORDERS}, got order={order}"
+        )
+    if distributed and force:
+        raise ValueError(
+            "`force=True` can't be combined with `distributed=True`, since nodes "
+            "can't tell configs finished by this sweep from earlier ones.  Remove "
+            "`artifact_dir/.bocas/queue/` to re-run a distributed sweep."
+        )
+    if getattr(search, "adaptive", False) and (distributed or order != "sweep"):
+        raise ValueError(
+            "Adaptive searches can't be combined with `distributed=True` or "
+            "`order='longest_first'`, since their configs depend on the results "
+            "completed so far."
+        )
+
+
+def _prepare_jobs(
+    path,
+    config,
+    artifact_dir,
+    use_cache,
+    force,
+    constraints,
+    order,
+    max_workers,
+    search=None,
+    observations=None,
+    dry_run=False,
+    distributed=False,
+    scheduler=None,
+):
+    """Returns `(fingerprint, index, jobs, plan)` for a sweep.
+
+    `jobs` is a callable returning an iterator of `(config, config_hash,
+    cached_dir)` tuples, in the order they should be launched.  `plan` is the
+    `bocas.planning.Plan` they follow, or `None` if they follow the sweep order.
+    `search` and `observations` are passed to `_iter_configs()`.  The nodes of a
+    `distributed` sweep each keep their own, in-memory `index`.  Results of
+    configs pruned by a scheduler are only reused with the same `scheduler`.
+    """
+    config_values = config.to_dict()
     os.makedirs(artifact_dir, exist_ok=True)
 
-    results = []
+    fingerprint = cache.task_fingerprint(path)
+    index = Index(artifact_dir, in_memory=distributed)
+    cache_index = {}
+    # Without a fingerprint there is no telling which version of the task produced
+    # a result, so none are reused.
+    reuse = use_cache and not force and fingerprint is not None
+    if reuse:
+        index.refresh()
+        pruned_by = scheduler.state_id() if scheduler is not None else None
+        rows = [row for row in index.query() if row["pruned_by"] in (None, pruned_by)]
+        # Completed results come last, taking precedence over pruned ones.
+        rows.sort(key=lambda row: row["pruned_by"] is None)
+        cache_index = {
+            (row["config_hash"], row["task_fingerprint"]): row["path"] for row in rows
+        }
 
-    for config in _iter_configs(config_values):
-        # TODO(lukewood): Graceful error handling, allow specification of strategies
-        # for error handling.
-        result = run(config)
-        if result is None:
-            raise ValueError(
-                "`result` returned from `run()` was `None`. "
-                "Did you forget a return statement?"
+    def jobs():
+        for config in _iter_configs(config_values, constraints, search, observations):
+            config_hash = cache.config_hash(config)
+            cached_dir = cache_index.get((config_hash, fingerprint))
+            yield config, config_hash, cached_dir
+
+    if order == "sweep" and not dry_run:
+        return fingerprint, index, jobs, None
+
+    if not reuse:
+        index.refresh()
+    cost_model = planning.CostModel(index.query())
+    plan = planning.plan(jobs(), cost_model, workers=max_workers or 1, order=order)
+
+    def planned_jobs():
+        return iter(plan.jobs)
+
+    return fingerprint, index, planned_jobs, plan
+
+
+def _run(
+    path,
+    config,
+    artifact_dir="artifacts",
+    max_workers=None,
+    max_configs_per_worker=None,
+    use_cache=True,
+    force=False,
+    cprofile=False,
+    profile_hooks=None,
+    constraints=None,
+    distributed=False,
+    lease_timeout=300,
+    poll_interval=10,
+    scheduler=None,
+    order="sweep",
+    search=None,
+    handles=False,
+    executor=None,
+    stream=True,
+):
+    """Runs a sweep, yielding `(position, result)` as each result is written.
+
+    `position` is the position of the result's config in the sweep.  `executor`
+    may be a callable accepting `(path, options, jobs)` and yielding the outcome of
+    each job, to run them somewhere else than in a fresh pool, see
+    `bocas.server.Server`.  Without `stream`, tasks run on the calling thread
+    don't wait for the previous result to be written, it is yielded later.
+    """
+    adaptive = getattr(search, "adaptive", False)
+    # `(point, value)` of every completed config, fed back to adaptive searches.
+    observations = [] if adaptive else None
+    fingerprint, index, jobs, plan = _prepare_jobs(
+        path,
+        config,
+        artifact_dir,
+        use_cache,
+        force,
+        constraints,
+        order,
+        max_workers,
+        search=search,
+        observations=observations,
+        distributed=distributed,
+        scheduler=scheduler,
+    )
+    ranges = _find_ranges(config.to_dict(), search) if adaptive else []
+    # `("written", position, result or result directory)` events are posted as soon
+    # as each result is on disk.  When jobs run elsewhere, `_fetch_outcomes()` posts
+    # `("outcome", i, outcome)` events, and a final `("end", None, error)`.
+    events = collections.deque()
+    progress = threading.Condition()
+
+    def post(event):
+        with progress:
+            events.append(event)
+            progress.notify()
+
+    def write(result, config_hash, profile, position):
+        start = time.perf_counter()
+        result_dir, serialization_format = _persist(result, artifact_dir)
+        profile.metrics.update(
+            {
+                "serialization_time": time.perf_counter() - start,
+                "serialization_format": serialization_format,
+                "serialized_bytes": profiling.result_files_size(result_dir),
+            }
+        )
+        profiling.write_profile(profile, result_dir)
+        result.artifacts.append(profile)
+        # Pruned configs didn't run to completion, their results are only reused by
+        # launches with the same scheduler, which would prune them again.
+        pruned_by = None
+        if scheduling.is_pruned(result):
+            pruned_by = scheduler.state_id()
+        cache.write_cache_entry(result_dir, config_hash, fingerprint, pruned_by)
+        # The config is done, it won't be resumed from its checkpoint.
+        shutil.rmtree(
+            os.path.join(result_dir, checkpoint.CHECKPOINT_DIR), ignore_errors=True
+        )
+        index.update(result_dir, result)
+        if queue is not None:
+            queue.complete(config_hash, result.name)
+        post(("written", position, result_dir if handles else result))
+
+    # Results are written on a background thread, so the next config can start
+    # while the previous result is serialized.
+    writer = ResultWriter(write)
+
+    def persist(i, outcome):
+        result, config_hash, cached, profile = outcome
+        if distributed:
+            position = positions[config_hash]
+        elif plan is not None:
+            position = plan.positions[i]
+        else:
+            position = i
+        if cached:
+            cprint(f"Using cached result for `{result.name}`.", "green")
+            post(
+                (
+                    "written",
+                    position,
+                    os.path.join(artifact_dir, result.name) if handles else result,
+                )
             )
-        if result.config is None:
-            result.config = config
+        else:
+            writer.submit(result, config_hash, profile, position)
+        if adaptive:
+            _observe(search, ranges, result, observations)
+
+    def loaded(result):
+        return Result.load(result, artifacts=[]) if handles else result
+
+    def drain():
+        while events:
+            _, position, result = events.popleft()
+            yield position, loaded(result)
+
+    queue = slots = stopped = None
+    if distributed or adaptive:
+        # Configs are only dispatched once a worker is free, so that idle nodes can
+        # take over the rest of the sweep, and adaptive searches draw each config
+        # from every result completed so far.
+        slots = threading.BoundedSemaphore(max_workers or 1)
+    elif max_workers is not None:
+        # The pool's feeder thread would otherwise expand and pickle the whole sweep
+        # up front.  Twice as many slots as workers, so that a long config doesn't
+        # leave the others idle while `imap()` waits for it.
+        slots = threading.BoundedSemaphore(2 * max_workers)
+    if slots is not None:
+        stopped = threading.Event()
+        persist = _release_slot_after(persist, slots)
+    if distributed:
+        queue_fingerprint = fingerprint
+        if scheduler is not None:
+            # Configs pruned by this scheduler are only done for launches using it.
+            queue_fingerprint = f"{fingerprint or ''}-{scheduler.state_id()}"
+        queue = WorkQueue(artifact_dir, queue_fingerprint, lease_timeout=lease_timeout)
+        positions = {}
+        if plan is not None:
+            positions.update(
+                (job[1], position) for job, position in zip(plan.jobs, plan.positions)
+            )
+        jobs = _claim_jobs(
+            queue, jobs, artifact_dir, slots, stopped, positions, poll_interval
+        )
+    elif slots is not None:
+        jobs = _gate_jobs(jobs, slots, stopped)
+
+    options = _ExecuteOptions(artifact_dir, cprofile, profile_hooks, scheduler)
+    if executor is not None:
+        outcomes = executor(path, options, jobs())
+    elif max_workers is None:
+        task = _load_task(path)
+        outcomes = (_execute(task, job, options) for job in jobs())
+    else:
+        outcomes = _run_in_pool(
+            path, options, jobs(), max_workers, max_configs_per_worker
+        )
+    abandoned = threading.Event()
+    # The writer exits first, so that leases are only released once every claimed
+    # result is written.
+    with queue or contextlib.nullcontext(), index, writer:
+        try:
+            if executor is not None or max_workers is not None:
+                # Outcomes are fetched on another thread, so that each result is
+                # yielded once it is written instead of once the next outcome
+                # arrives.
+                threading.Thread(
+                    target=_fetch_outcomes,
+                    args=(outcomes, post, abandoned),
+                    daemon=True,
+                ).start()
+                while True:
+                    with progress:
+                        progress.wait_for(lambda: events)
+                        kind, key, payload = events.popleft()
+                    if kind == "written":
+                        yield key, loaded(payload)
+                    elif kind == "outcome":
+                        persist(key, payload)
+                    elif payload is not None:
+                        raise payload
+                    else:
+                        break
+            else:
+                # Tasks run on this thread, so the next one only starts once the
+                # consumer asks for the next result.
+                with contextlib.closing(outcomes):
+                    for i, outcome in enumerate(outcomes):
+                        persist(i, outcome)
+                        if stream:
+                            writer.flush()
+                        yield from drain()
+        finally:
+            abandoned.set()
+            if stopped is not None:
+                stopped.set()
+    yield from drain()
+
+
+def _fetch_outcomes(outcomes, post, abandoned):
+    """Posts an event for the outcome of each job, until `abandoned` is set."""
+    error = None
+    try:
+        with contextlib.closing(outcomes):
+            for i, outcome in enumerate(outcomes):
+                if abandoned.is_set():
+                    break
+                post(("outcome", i, outcome))
+    except BaseException as e:
+        error = e
+    post(("end", None, error))
+
+
+def _gate_jobs(jobs, slots, stopped):
+    """Wraps `jobs` to only draw the next job once a dispatch slot is free."""
+
+    def gated_jobs():
+        iterator = jobs()
+        while True:
+            while not slots.acquire(timeout=1):
+                if stopped.is_set():
+                    return
+            job = next(iterator, None)
+            if job is None:
+                slots.release()
+                return
+            yield job
+
+    return gated_jobs
+
+
+def _observe(search, ranges, result, observations):
+    """Records the point of `result`'s config and its `search.metric`."""
+    value = scalar_metrics(result).get(search.metric)
+    try:
+        point = tuple(
+            distribution.to_unit(_get_path(result.config, path))
+            for path, distribution in ranges
+        )
+    except (KeyError, ValueError, TypeError):
+        point = None
+    if value is None or point is None:
+        cprint(
+            f"Not feeding `{result.name}` back to the search, it has no "
+            f"`{search.metric}` metric or drawn config values.",
+            "yellow",
+        )
+        return
+    observations.append((point, float(value)))
+
+
+def _claim_jobs(queue, jobs, artifact_dir, slots, stopped, positions, poll_interval):
+    """Wraps `jobs` to only yield the configs this node claimed or that are done.
+
+    Configs leased by other nodes are retried every `poll_interval` seconds until
+    they are done, or their lease went stale and could be claimed.  The position of
+    each config in the sweep is recorded in `positions`, keyed by its hash.
+    """
+
+    def claimed_jobs():
+        deferred = []
+        for job in jobs():
+            positions.setdefault(job[1], len(positions))
+            claimed = _try_claim(queue, job, artifact_dir, slots, stopped)
+            if claimed is None:
+                deferred.append(job)
+            elif claimed is not False:
+                yield claimed
+        while deferred and not stopped.is_set():
+            time.sleep(poll_interval)
+            pending, deferred = deferred, []
+            for job in pending:
+                claimed = _try_claim(queue, job, artifact_dir, slots, stopped)
+                if claimed is None:
+                    deferred.append(job)
+                elif claimed is not False:
+                    yield claimed
 
-        result_dir = os.path.join(artifact_dir, result.name)
-        os.makedirs(result_dir, exist_ok=True)
+    return claimed_jobs
 
+
+def _try_claim(queue, job, artifact_dir, slots, stopped):
+    """Returns the job to run, `None` if another node holds it, or `False` to stop."""
+    # Waiting for a free slot with a timeout lets the pool's feeder thread exit
+    # when the run is aborted.
+    while not slots.acquire(timeout=1):
+        if stopped.is_set():
+            return False
+    config, config_hash, cached_dir = job
+    if cached_dir is None:
+        done = queue.done(config_hash)
+        if done is None and queue.claim(config_hash):
+            # The config may have been completed between `done()` and `claim()`.
+            done = queue.done(config_hash)
+            if done is not None:
+                queue.release(config_hash)
+        elif done is None:
+            slots.release()
+            return None
+        if done is not None:
+            cached_dir = os.path.join(artifact_dir, done)
+    return config, config_hash, cached_dir
+
+
+def _release_slot_after(persist, slots):
+    """Wraps `persist` to free a dispatch slot once an outcome is persisted."""
+
+    def persist_and_release(i, outcome):
+        try:
+            persist(i, outcome)
+        finally:
+            slots.release()
+
+    return persist_and_release
+
+
+def _run_in_pool(path, options, jobs, max_workers, max_configs_per_worker):
+    """Yields the outcome of each job, run in a pool of worker processes."""
+    # `spawn` gives each worker a fresh interpreter, so TensorFlow state does not
+    # leak from the parent or across recycled workers.
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(
+        processes=max_workers,
+        initializer=_init_worker,
+        initargs=(path, options),
+        maxtasksperchild=max_configs_per_worker,
+    ) as pool:
+        # `imap()` yields in submission order, keeping the output deterministic.
+        yield from pool.imap(_execute_in_worker, jobs)
+
+
+def _init_worker(path, options):
+    global _worker_task, _worker_options
+    _worker_task = _load_task(path)
+    _worker_options = options
+
+
+def _execute_in_worker(job):
+    return _execute(_worker_task, job, _worker_options)
+
+
+def _execute(task, job, options):
+    """Returns a tuple of `(result, config_hash, cached, profile)` for a job."""
+    config, config_hash, cached_dir = job
+    if cached_dir is not None:
         try:
-            serialize_yaml(result, result_dir)
+            return Result.load(cached_dir), config_hash, True, None
         except Exception as e:
-            cprint(f"YAML serialization failed with error: {e}.", "red")
-            cprint("Defaulting to saving result as pickle.", "red")
-            fallback_to_pickle(result, result_dir)
+            cprint(f"Failed to load cached result {cached_dir}: {e}.", "red")
 
-        results.append(result)
+    # TODO(lukewood): Graceful error handling, allow specification of strategies
+    # for error handling.
+    with stages.artifact_dir_context(
+        options.artifact_dir
+    ), checkpoint.checkpoint_context(
+        options.artifact_dir, config_hash
+    ), scheduling.trial_context(
+        options.scheduler, options.artifact_dir, config_hash
+    ) as trial, profiling.profile_task(
+        config, cprofile=options.cprofile, hooks=options.profile_hooks
+    ) as profile:
+        try:
+            result = task(config)
+        except scheduling.Pruned as e:
+            cprint(f"Pruned config {config_hash[:12]} at step {e.step}.", "yellow")
+            # Pruned configs are recorded under a name derived from their config,
+            # since the task didn't get to name its result.
+            result = Result(f"pruned-{config_hash[:12]}", artifacts=[])
+    if result is None:
+        raise ValueError(
+            "`result` returned from `run()` was `None`. "
+            "Did you forget a return statement?"
+        )
+    if result.config is None:
+        result.config = config
+    if trial is not None:
+        result.artifacts.extend(trial.artifacts())
+    profiling.dump_cprofile(profile, os.path.join(options.artifact_dir, result.name))
+    return result, config_hash, False, profile
+
+
+def _persist(result, artifact_dir):
+    result_dir = os.path.join(artifact_dir, result.name)
+    os.makedirs(result_dir, exist_ok=True)
+
+    try:
+        serialize_yaml(result, result_dir)
+        serialization_format = "yaml"
+    except Exception as e:
+        cprint(f"YAML serialization failed with error: {e}.", "red")
+        cprint("Defaulting to saving result as pickle.", "red")
+        fallback_to_pickle(result, result_dir)
+        serialization_format = "pickle"
 
-    return results
+    return result_dir, serialization_format
 
 
 def serialize_yaml(result, result_dir):
-    # Dump results to yaml
-    serialized_result = yaml.dump(result, default_flow_style=False)
-    if not contains_only_registered_tags(serialized_result):
+    # Each artifact is dumped to its own file, `artifacts/<generation>/<i>/`, so
+    # that it can be loaded on its own.  `results.yaml` references those files.
+    # Numeric arrays are written to binary sidecars next to each artifact.  Each
+    # write uses a fresh generation, so the files referenced by a previous
+    # `results.yaml` stay intact until the new one has replaced it.
+    generation_dir = os.path.join(yamlify.ARTIFACTS_DIR, uuid.uuid4().hex[:8])
+    try:
+        references = []
+        for i, artifact in enumerate(_materialized(result).artifacts):
+            artifact_subdir = os.path.join(generation_dir, f"{i:03d}")
+            artifact_path = os.path.join(artifact_subdir, "artifact.yaml")
+            serialized_artifact = yamlify.dump(
+                artifact, sidecar_dir=result_dir, sidecar_subdir=artifact_subdir
+            )
+            _check_registered_tags(serialized_artifact)
+            os.makedirs(os.path.join(result_dir, artifact_subdir), exist_ok=True)
+            with open(os.path.join(result_dir, artifact_path), "w") as f:
+                f.write(serialized_artifact)
+            references.append(LazyArtifact(artifact.name, artifact_path))
+
+        serialized_result = yamlify.dump(
+            Result(result.name, artifacts=references, config=result.config)
+        )
+        _check_registered_tags(serialized_result)
+    except BaseException:
+        shutil.rmtree(os.path.join(result_dir, generation_dir), ignore_errors=True)
+        raise
+
+    atomic_write(os.path.join(result_dir, "results.yaml"), serialized_result)
+    _remove_stale_files(result_dir, keep="results.yaml", generation_dir=generation_dir)
+
+
+def _check_registered_tags(serialized):
+    if not yamlify.contains_only_registered_tags(serialized):
         raise ValueError(f"YAML serialization contained unregistered tags")
 
-    with open(os.path.join(result_dir, "results.yaml"), "w") as f:
-        f.write(serialized_result)
+
+def _materialized(result):
+    """Returns `result`, with any `LazyArtifact` replaced by the artifact itself."""
+    if not any(isinstance(a, LazyArtifact) for a in result.artifacts):
+        return result
+    artifacts = [
+        a.materialize() if isinstance(a, LazyArtifact) else a for a in result.artifacts
+    ]
+    return Result(result.name, artifacts=artifacts, config=result.config)
 
 
 def fallback_to_pickle(result, result_dir):
     # Save result as pickle
-    with open(os.path.join(result_dir, "results.p"), "wb") as f:
-        pickle.dump(result, f)
+    atomic_write(
+        os.path.join(result_dir, "results.p"), pickle.dumps(_materialized(result))
+    )
+    _remove_stale_files(result_dir, keep="results.p")
+
+
+def _remove_stale_files(result_dir, keep, generation_dir=None):
+    """Removes files left behind by previous results written to `result_dir`."""
+    for filename in cache.RESULT_FILES:
+        if filename != keep and os.path.exists(os.path.join(result_dir, filename)):
+            os.remove(os.path.join(result_dir, filename))
+
+    # Results written by older versions of `bocas` kept their sidecars in `arrays/`.
+    for root in (yamlify.ARTIFACTS_DIR, yamlify.SIDECAR_DIR):
+        root = os.path.join(result_dir, root)
+        if not os.path.isdir(root):
+            continue
+        for entry in os.scandir(root):
+            if generation_dir is not None and entry.path == os.path.join(
+                result_dir, generation_dir
+            ):
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                os.remove(entry.path)
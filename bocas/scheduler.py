@@ -0,0 +1,248 @@
+import contextlib
+import json
+import os
+import zlib
+
+from bocas import cache
+from bocas.artifacts import KerasHistory, Metrics
+from bocas.index import INDEX_DIR
+
+SCHEDULER_DIR = "scheduler"
+
+# The trial of the config currently being run, set by `bocas.run()`.
+_trial = None
+
+
+class Pruned(Exception):
+    """Raised by `bocas.report()` when the scheduler stops the current config.
+
+    Tasks don't need to catch it: `bocas.run()` records a `Result` for configs that
+    were pruned.  A task that catches it may return its own `Result` instead, which
+    is recorded along with why and when the config was stopped.
+    """
+
+    def __init__(self, step, rung, reason):
+        super().__init__(reason)
+        self.step = step
+        self.rung = rung
+        self.reason = reason
+
+
+def report(step, metrics):
+    """Reports intermediate metrics of the config being run, i.e. after an epoch.
+
+    When `bocas.run()` was given a `scheduler`, this may raise `bocas.Pruned` to
+    stop the config early.  Outside of a scheduled run this does nothing.
+
+    Usage:
+    ```python
+    def run(config):
+        for epoch in range(config.epochs):
+            ...
+            bocas.report(epoch + 1, {"val_accuracy": val_accuracy})
+    ```
+
+    Args:
+        step: the amount of budget used so far, i.e. the number of epochs.
+        metrics: dictionary of metrics, containing the scheduler's `metric`.
+    """
+    if _trial is not None:
+        _trial.report(step, metrics)
+
+
+class SuccessiveHalving:
+    """Stops underperforming configs early, with asynchronous successive halving.
+
+    Rungs are placed at steps `min_step * reduction_factor**k`.  When a config
+    reports a step that reaches a rung, its `metric` is compared to the values
+    every other config of the sweep reported at that rung so far.  It continues
+    only if it is within the best `1 / reduction_factor` of them, so the budget of
+    stopped configs goes to promising ones.  Decisions never wait on other configs,
+    which keeps every worker busy.
+
+    The values reported at each rung are stored in `artifact_dir/.bocas/scheduler/`,
+    so the configs of parallel and distributed runs are compared with each other.
+
+    Usage:
+    ```python
+    scheduler = bocas.SuccessiveHalving("val_accuracy", mode="max", min_step=1)
+    bocas.run("run.py", config, scheduler=scheduler)
+    ```
+
+    Args:
+        metric: name of the reported metric to compare configs on.
+        mode: either "max" or "min".
+        min_step: step of the first rung.
+        reduction_factor: fraction of configs stopped at each rung is
+            `1 - 1 / reduction_factor`.
+        max_step: (Optional) no rungs are placed past this step.
+    """
+
+    def __init__(
+        self, metric, mode="max", min_step=1, reduction_factor=3, max_step=None
+    ):
+        if mode not in ("max", "min"):
+            raise ValueError(f"Expected `mode` to be 'max' or 'min', got mode={mode}")
+        if reduction_factor < 2:
+            raise ValueError(
+                f"Expected `reduction_factor` to be at least 2, got {reduction_factor}"
+            )
+        if min_step <= 0:
+            raise ValueError(f"Expected `min_step` to be positive, got {min_step}")
+        self.metric = metric
+        self.mode = mode
+        self.min_step = min_step
+        self.reduction_factor = reduction_factor
+        self.max_step = max_step
+
+    def bracket(self, config_hash):
+        """Returns the bracket `config_hash` is run in."""
+        return 0
+
+    def rung_step(self, bracket, rung):
+        """Returns the step of a rung, or `None` if there is no such rung."""
+        step = self.min_step * self.reduction_factor ** (bracket + rung)
+        if self.max_step is not None and step > self.max_step:
+            return None
+        return step
+
+    def should_continue(self, value, rung_values):
+        """Returns whether `value` is promoted past a rung holding `rung_values`.
+
+        `rung_values` includes `value` itself.
+        """
+        ranked = sorted(rung_values, reverse=self.mode == "max")
+        top_k = max(1, len(ranked) // self.reduction_factor)
+        threshold = ranked[top_k - 1]
+        return value >= threshold if self.mode == "max" else value <= threshold
+
+    def state_id(self):
+        """Identifies the scheduler's state on disk."""
+        params = {"type": type(self).__name__, **vars(self)}
+        return cache.config_hash(params)[:16]
+
+
+class Hyperband(SuccessiveHalving):
+    """Hyperband hedges the aggressiveness of successive halving over brackets.
+
+    Configs are spread over `num_brackets` brackets by their hash.  Bracket `b`
+    runs `bocas.SuccessiveHalving` with its first rung at
+    `min_step * reduction_factor**b`, so later brackets give every config more
+    budget before stopping any of them.
+
+    Args:
+        num_brackets: number of brackets.
+        **kwargs: passed to `bocas.SuccessiveHalving`.
+    """
+
+    def __init__(self, metric, num_brackets=3, **kwargs):
+        super().__init__(metric, **kwargs)
+        if num_brackets < 1:
+            raise ValueError(
+                f"Expected `num_brackets` to be at least 1, got {num_brackets}"
+            )
+        self.num_brackets = num_brackets
+
+    def bracket(self, config_hash):
+        return zlib.crc32(config_hash.encode("utf-8")) % self.num_brackets
+
+
+class Trial:
+    """Tracks the reports of one config, and applies the scheduler's decisions."""
+
+    def __init__(self, scheduler, artifact_dir, config_hash):
+        self.scheduler = scheduler
+        self.config_hash = config_hash
+        self.bracket = scheduler.bracket(config_hash)
+        self.directory = os.path.join(
+            artifact_dir, INDEX_DIR, SCHEDULER_DIR, scheduler.state_id()
+        )
+        self.history = {}
+        self.rung = 0
+        self.pruned = None
+
+    def report(self, step, metrics):
+        self.history.setdefault("step", []).append(step)
+        for key, value in metrics.items():
+            self.history.setdefault(key, []).append(value)
+
+        rung_step = self.scheduler.rung_step(self.bracket, self.rung)
+        while rung_step is not None and step >= rung_step:
+            if self.scheduler.metric not in metrics:
+                raise ValueError(
+                    f"Expected the metrics passed to `bocas.report()` to contain the "
+                    f"scheduler's metric `{self.scheduler.metric}`, instead got "
+                    f"[{', '.join(metrics)}]"
+                )
+            value = float(metrics[self.scheduler.metric])
+            rung_values = self._record(value)
+            if not self.scheduler.should_continue(value, rung_values):
+                self.pruned = Pruned(
+                    step,
+                    self.rung,
+                    f"{self.scheduler.metric}={value} was not in the best "
+                    f"1/{self.scheduler.reduction_factor} of the {len(rung_values)} "
+                    f"configs at rung {self.rung} (step {rung_step}).",
+                )
+                raise self.pruned
+            self.rung += 1
+            rung_step = self.scheduler.rung_step(self.bracket, self.rung)
+
+    def artifacts(self):
+        """Returns the artifacts recording the reports and the scheduler's decision."""
+        status = {"status": "completed", "rung": self.rung}
+        if self.pruned is not None:
+            status = {
+                "status": "pruned",
+                "rung": self.pruned.rung,
+                "stopped_at_step": self.pruned.step,
+                "reason": self.pruned.reason,
+            }
+        artifacts = [Metrics(status, name="scheduler")]
+        if self.history:
+            artifacts.append(KerasHistory(self.history, name="reports"))
+        return artifacts
+
+    def _record(self, value):
+        """Records `value` at the current rung, and returns every value recorded."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"bracket-{self.bracket}-rung-{self.rung}")
+        line = json.dumps({"config_hash": self.config_hash, "value": value}) + "\n"
+        # A single `O_APPEND` write, so records of concurrent configs don't interleave.
+        with open(path, "a") as f:
+            f.write(line)
+        values = {}
+        with open(path, "r") as f:
+            for record in f:
+                try:
+                    record = json.loads(record)
+                except ValueError:
+                    continue
+                values[record["config_hash"]] = record["value"]
+        return list(values.values())
+
+
+def is_pruned(result):
+    """Returns whether `result` belongs to a config that a scheduler stopped early."""
+    for artifact in result.artifacts:
+        if isinstance(artifact, Metrics) and artifact.name == "scheduler":
+            return artifact.metrics.get("status") == "pruned"
+    return False
+
+
+@contextlib.contextmanager
+def trial_context(scheduler, artifact_dir, config_hash):
+    """Routes `bocas.report()` to a new `Trial` within the context.
+
+    Yields `None` if `scheduler` is `None`.
+    """
+    global _trial
+    if scheduler is None:
+        yield None
+        return
+    previous = _trial
+    _trial = Trial(scheduler, artifact_dir, config_hash)
+    try:
+        yield _trial
+    finally:
+        _trial = previous
@@ -0,0 +1,46 @@
+"""Keeps warm workers running, to run the sweeps submitted by `bocas.launch`.
+
+Usage:
+```
+python -m bocas.serve --max_workers=4 --preload=tasks/oxford_102/run.py
+python -m bocas.launch --task=tasks/oxford_102/run.py --config=sweep.py --server
+```
+"""
+
+import sys
+
+from absl import flags
+
+from bocas import server
+
+
+def serve():
+    FLAGS = flags.FLAGS
+
+    flags.DEFINE_string(
+        "address",
+        None,
+        "path of the Unix socket to listen on, defaults to a directory private to "
+        "the user.",
+    )
+    flags.DEFINE_integer("max_workers", 1, "number of warm worker processes.")
+    flags.DEFINE_integer(
+        "max_configs_per_worker",
+        None,
+        "number of configs a worker process runs before it is recycled.",
+    )
+    flags.DEFINE_multi_string(
+        "preload", [], "path of a task every worker imports as it starts."
+    )
+
+    FLAGS(sys.argv)
+    server.Server(
+        FLAGS.address,
+        max_workers=FLAGS.max_workers,
+        max_configs_per_worker=FLAGS.max_configs_per_worker,
+        preload=FLAGS.preload,
+    ).serve_forever()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,261 @@
+import contextlib
+import getpass
+import multiprocessing
+import os
+import stat
+import tempfile
+import threading
+import traceback
+from multiprocessing import connection
+
+from termcolor import cprint
+
+from bocas.result import Result
+from bocas.run import _execute, _load_task, _run
+from bocas.writer import atomic_write
+
+# Clients authenticate with the key the server stores next to its socket.
+AUTHKEY_SUFFIX = ".key"
+
+# Tasks loaded by a warm worker, keyed by path, along with the `st_mtime_ns` of the
+# source they were loaded from.
+_warm_tasks = {}
+
+
+class Server:
+    """Server runs sweeps submitted by `bocas.launch --server` in warm workers.
+
+    Launching a sweep normally pays for starting Python, importing TensorFlow,
+    importing the task and rebuilding any state it caches, every time.  The
+    server keeps a pool of worker processes alive between sweeps instead.  Each
+    worker imports a task once, and only reloads it when its source file changes,
+    so the outputs of `bocas.cached_stage` (i.e. loaded datasets) stay in memory
+    across sweeps too.  Modules imported by the task are not reloaded; restart the
+    server after changing them.
+
+    Sweeps are submitted over a Unix socket with `submit()`.  The socket is created
+    in a directory private to the current user, and both ends authenticate with a
+    random key the server writes next to it, readable only by that user.  Results
+    are written by the server exactly like `bocas.run()` would.
+
+    Usage:
+    ```
+    python -m bocas.serve --max_workers=4 --preload=tasks/oxford_102/run.py
+    python -m bocas.launch --task=tasks/oxford_102/run.py --config=sweep.py --server
+    ```
+
+    Args:
+        address: (Optional) path of the Unix socket to listen on, defaults to
+            `default_address()`.  Its directory is created if needed, and must not
+            be writable by other users.
+        max_workers: number of warm worker processes.
+        max_configs_per_worker: (Optional) number of configs each worker runs
+            before it is replaced by a fresh (cold) process.
+        preload: (Optional) paths of tasks every worker imports as it starts.
+    """
+
+    def __init__(
+        self,
+        address=None,
+        max_workers=1,
+        max_configs_per_worker=None,
+        preload=(),
+    ):
+        if address is None:
+            address = default_address()
+        self.address = address
+        self.max_workers = max_workers
+        _check_private_directory(os.path.dirname(address), create=True)
+        _remove_stale_socket(address)
+        authkey = os.urandom(32)
+        atomic_write(address + AUTHKEY_SUFFIX, authkey)
+        # Bound under a restrictive umask, so the socket is never accessible to
+        # other users, not even before it could be `chmod`ed.
+        umask = os.umask(0o077)
+        try:
+            self.listener = connection.Listener(
+                address, family="AF_UNIX", authkey=authkey
+            )
+        finally:
+            os.umask(umask)
+        # `spawn` gives each worker a fresh interpreter, like `bocas.run()`.
+        context = multiprocessing.get_context("spawn")
+        self.pool = context.Pool(
+            processes=max_workers,
+            initializer=_init_warm_worker,
+            initargs=([os.path.abspath(path) for path in preload],),
+            maxtasksperchild=max_configs_per_worker,
+        )
+
+    def serve_forever(self):
+        cprint(f"Serving {self.max_workers} warm worker(s) on {self.address}.", "green")
+        try:
+            while True:
+                try:
+                    client = self.listener.accept()
+                except (connection.AuthenticationError, EOFError, OSError) as e:
+                    cprint(f"Rejected a connection: {e!r}.", "yellow")
+                    continue
+                threading.Thread(
+                    target=self._handle, args=(client,), daemon=True
+                ).start()
+        finally:
+            self.close()
+
+    def close(self):
+        self.listener.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.address + AUTHKEY_SUFFIX)
+        self.pool.terminate()
+        self.pool.join()
+
+    def _handle(self, client):
+        with client:
+            try:
+                path, config, kwargs = client.recv()
+                cprint(f"Running a sweep of {path}.", "green")
+                kwargs["max_workers"] = self.max_workers
+                results = _run(path, config, executor=self._outcomes, **kwargs)
+                with contextlib.closing(results):
+                    for position, result in results:
+                        result_dir = os.path.join(kwargs["artifact_dir"], result.name)
+                        client.send(("result", position, result_dir))
+                client.send(("done", None, None))
+            except (EOFError, BrokenPipeError, ConnectionResetError):
+                cprint("Client disconnected, stopped its sweep.", "yellow")
+            except Exception:
+                cprint(traceback.format_exc(), "red")
+                try:
+                    client.send(("error", None, traceback.format_exc()))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+    def _outcomes(self, path, options, jobs):
+        stopped = threading.Event()
+
+        def warm_jobs():
+            # The pool keeps pulling jobs after a client disconnected, until told
+            # to stop.
+            for job in jobs:
+                if stopped.is_set():
+                    return
+                yield path, options, job
+
+        try:
+            yield from self.pool.imap(_execute_in_warm_worker, warm_jobs())
+        finally:
+            stopped.set()
+
+
+def default_address():
+    """Returns the default path of the server's socket.
+
+    The socket lives in a directory only the current user can access, preferably
+    the per-user runtime directory.
+    """
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        directory = os.path.join(os.environ["XDG_RUNTIME_DIR"], "bocas")
+    else:
+        directory = os.path.join(tempfile.gettempdir(), f"bocas-{getpass.getuser()}")
+    return os.path.join(directory, "server.sock")
+
+
+def submit(path, config, address=None, **kwargs):
+    """Runs a sweep on a `Server`, and returns its results once every one is written.
+
+    Args:
+        path: path to a `run.py` file containing a `run()` method.
+        config: `ml_collections.ConfigDict` that may contain `bocas.Sweep` values.
+        address: (Optional) path of the server's socket, defaults to
+            `default_address()`.
+        **kwargs: arguments of `bocas.run()`, except `max_workers`,
+            `max_configs_per_worker` and `dry_run`, which are set by the server.
+            Arguments must be picklable.
+
+    Returns:
+        a list of `bocas.Result`, in the order the configs were expanded.  Their
+        artifacts are loaded from disk on first access.
+    """
+    for key in ("max_workers", "max_configs_per_worker", "dry_run"):
+        if kwargs.pop(key, None) is not None:
+            cprint(f"Ignoring `{key}`, it is set by the server.", "yellow")
+    # The server doesn't share the client's working directory.
+    path = os.path.abspath(path)
+    kwargs["artifact_dir"] = os.path.abspath(kwargs.get("artifact_dir", "artifacts"))
+    if address is None:
+        address = default_address()
+
+    _check_private_directory(os.path.dirname(address))
+    try:
+        with open(address + AUTHKEY_SUFFIX, "rb") as f:
+            authkey = f.read()
+    except FileNotFoundError:
+        raise ValueError(f"No server is running on {address}") from None
+
+    result_dirs = []
+    # The server proves it holds the key as well, so results aren't taken from
+    # whoever else managed to listen on `address`.
+    with connection.Client(address, family="AF_UNIX", authkey=authkey) as client:
+        client.send((path, config, kwargs))
+        while True:
+            kind, position, payload = client.recv()
+            if kind == "error":
+                raise RuntimeError(f"The sweep failed on the server:\n{payload}")
+            if kind == "done":
+                break
+            cprint(f"Finished `{os.path.basename(payload)}`.", "green")
+            result_dirs.append((position, payload))
+    return [
+        Result.load(result_dir, artifacts=[])
+        for _, result_dir in sorted(result_dirs, key=lambda r: r[0])
+    ]
+
+
+def _check_private_directory(directory, create=False):
+    """Raises a `ValueError` if other users could replace files in `directory`."""
+    if create and not os.path.isdir(directory):
+        os.makedirs(os.path.dirname(directory), exist_ok=True)
+        with contextlib.suppress(FileExistsError):
+            os.mkdir(directory, 0o700)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise ValueError(f"Expected {directory} to be a directory owned by you.")
+    if info.st_mode & 0o022:
+        raise ValueError(
+            f"Expected {directory} not to be writable by other users, its mode is "
+            f"{oct(stat.S_IMODE(info.st_mode))}."
+        )
+
+
+def _remove_stale_socket(address):
+    """Removes the socket of a server that is no longer running."""
+    if not os.path.exists(address):
+        return
+    try:
+        connection.Client(address, family="AF_UNIX").close()
+    except ConnectionRefusedError:
+        os.remove(address)
+        return
+    raise ValueError(f"A server is already listening on {address}")
+
+
+def _init_warm_worker(preload):
+    for path in preload:
+        _load_warm_task(path)
+
+
+def _load_warm_task(path):
+    """Returns the task at `path`, only re-importing it if its source changed."""
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    loaded = _warm_tasks.get(path)
+    if loaded is None or loaded[0] != mtime:
+        if loaded is not None:
+            cprint(f"Reloading {path}, its source changed.", "yellow")
+        _warm_tasks[path] = (mtime, _load_task(path))
+    return _warm_tasks[path][1]
+
+
+def _execute_in_warm_worker(args):
+    path, options, job = args
+    return _execute(_load_warm_task(path), job, options)
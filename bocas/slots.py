@@ -0,0 +1,27 @@
+"""Pickle support for the `__slots__` classes of `bocas`.
+
+`Result` and `Artifact` use `__slots__` to keep large collections small in memory.
+Results pickled before that stored a plain `__dict__`, so `set_state()` accepts both
+layouts.
+"""
+
+
+def get_state(obj, exclude=()):
+    """Returns the attributes of `obj` as a dictionary, for `__getstate__()`."""
+    state = dict(getattr(obj, "__dict__", {}))
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        for slot in (slots,) if isinstance(slots, str) else slots:
+            if slot not in exclude and slot != "__dict__" and hasattr(obj, slot):
+                state[slot] = getattr(obj, slot)
+    return state
+
+
+def set_state(obj, state):
+    """Restores the attributes returned by `get_state()`, for `__setstate__()`."""
+    if isinstance(state, tuple):
+        # `(__dict__, slots)`, as produced by the default `object.__reduce_ex__()`.
+        dict_state, slot_state = state
+        state = {**(dict_state or {}), **(slot_state or {})}
+    for key, value in state.items():
+        object.__setattr__(obj, key, value)
@@ -0,0 +1,155 @@
+import collections
+import contextlib
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+
+from termcolor import cprint
+
+from bocas import cache
+from bocas.index import INDEX_DIR
+from bocas.writer import atomic_write
+
+STAGES_DIR = "stages"
+
+# The `artifact_dir` of the sweep currently being run, set by `bocas.run()`.
+_artifact_dir = None
+
+
+@contextlib.contextmanager
+def artifact_dir_context(artifact_dir):
+    """Makes `artifact_dir` the on-disk home of `cached_stage` outputs in the context."""
+    global _artifact_dir
+    previous = _artifact_dir
+    _artifact_dir = artifact_dir
+    try:
+        yield
+    finally:
+        _artifact_dir = previous
+
+
+def cached_stage(keys, maxsize=4, disk=False):
+    """Memoizes a stage of a task that only depends on a few config keys.
+
+    The decorated function must accept the config as its first argument.  Its output
+    is cached under a hash of the values of `keys` in the config (along with any
+    other arguments), so configs of a sweep that agree on `keys` run the stage once.
+
+    Usage:
+    ```python
+    @bocas.cached_stage(keys=["dataset", "image_size"])
+    def load_dataset(config):
+        ...
+
+    def run(config):
+        train_ds, test_ds = load_dataset(config)
+        ...
+    ```
+
+    Args:
+        keys: config keys the stage depends on.  Nested keys are written with dots,
+            i.e. `data.image_size`.
+        maxsize: number of outputs to keep in memory, least recently used outputs
+            are evicted first.  Outputs are kept per process, so each worker of a
+            parallel `bocas.run()` has its own cache.
+        disk: whether to also pickle outputs to `artifact_dir/.bocas/stages/`, so
+            that they are shared between workers and runs of the sweep.  Outputs
+            that can't be pickled are only cached in memory.  Disk caching only
+            applies while the task is run by `bocas.run()`.
+    """
+    if isinstance(keys, str):
+        keys = [keys]
+
+    def decorator(fn):
+        return CachedStage(fn, keys, maxsize=maxsize, disk=disk)
+
+    return decorator
+
+
+class CachedStage:
+    """A function memoized by `bocas.cached_stage()`."""
+
+    def __init__(self, fn, keys, maxsize=4, disk=False):
+        if maxsize < 1:
+            raise ValueError(f"Expected `maxsize` to be at least 1, got {maxsize}")
+        functools.update_wrapper(self, fn)
+        self.fn = fn
+        self.keys = list(keys)
+        self.maxsize = maxsize
+        self.disk = disk
+        self.cache = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, config, *args, **kwargs):
+        key = self.cache_key(config, *args, **kwargs)
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        self.misses += 1
+        path = self._disk_path(key)
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        else:
+            value = self.fn(config, *args, **kwargs)
+            if path is not None:
+                self._write(path, value)
+
+        self.cache[key] = value
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+        return value
+
+    def cache_key(self, config, *args, **kwargs):
+        """Returns the hash identifying the stage's output for these arguments."""
+        values = {key: _lookup(config, key) for key in self.keys}
+        return cache.config_hash({"keys": values, "args": args, "kwargs": kwargs})
+
+    def cache_clear(self):
+        """Empties the in-memory cache.  Outputs stored on disk are kept."""
+        self.cache.clear()
+
+    def _disk_path(self, key):
+        if not self.disk or _artifact_dir is None:
+            return None
+        # Editing the stage's source invalidates its outputs on disk.
+        try:
+            source = inspect.getsource(self.fn)
+        except (OSError, TypeError):
+            source = ""
+        fingerprint = hashlib.sha256(source.encode("utf-8")).hexdigest()[:12]
+        stage_dir = f"{self.fn.__module__}.{self.fn.__qualname__}-{fingerprint}"
+        return os.path.join(_artifact_dir, INDEX_DIR, STAGES_DIR, stage_dir, f"{key}.p")
+
+    def _write(self, path, value):
+        try:
+            serialized = pickle.dumps(value)
+        except Exception as e:
+            cprint(
+                f"Output of stage `{self.fn.__qualname__}` can't be pickled, only "
+                f"caching it in memory: {e}.",
+                "yellow",
+            )
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, serialized)
+
+
+def _lookup(config, key):
+    value = config
+    for part in key.split("."):
+        try:
+            value = value[part]
+        except (KeyError, TypeError):
+            raise ValueError(
+                f"`bocas.cached_stage()` depends on `{key}`, which was not found in "
+                "the config."
+            )
+    if hasattr(value, "to_dict"):
+        value = value.to_dict()
+    return value
@@ -0,0 +1,60 @@
+import json
+import numbers
+
+from bocas.artifacts import Metrics
+
+
+def flatten_config(config):
+    """Flattens a `ConfigDict` into a dictionary keyed by dotted paths."""
+    if config is None:
+        return {}
+    if hasattr(config, "to_dict"):
+        config = config.to_dict()
+    return dict(_flatten(config))
+
+
+def to_json(values):
+    """Serializes flattened configs or metrics to JSON, as stored in the index."""
+    return json.dumps(values, sort_keys=True, default=_json_default)
+
+
+def normalize(value):
+    """Returns `value` as it reads back from `to_json()`, i.e. tuples as lists."""
+    return json.loads(to_json(value))
+
+
+def scalar_metrics(result):
+    """Returns the scalar metrics of a `Result`, keyed by `{artifact}/{metric}`."""
+    metrics = {}
+    for artifact in result.artifacts:
+        if not isinstance(artifact, Metrics) or not isinstance(artifact.metrics, dict):
+            continue
+        for metric, value in artifact.metrics.items():
+            if _is_scalar(value):
+                metrics[f"{artifact.name}/{metric}"] = value
+    return metrics
+
+
+def _flatten(config, prefix=""):
+    for key, value in config.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, prefix=f"{prefix}{key}.")
+        elif isinstance(value, list):
+            # Lists are converted to tuples so that they can be grouped on.
+            yield f"{prefix}{key}", tuple(value)
+        else:
+            yield f"{prefix}{key}", value
+
+
+def _json_default(value):
+    # numpy scalars
+    if hasattr(value, "item") and hasattr(value, "dtype"):
+        return value.item()
+    return repr(value)
+
+
+def _is_scalar(value):
+    # numpy scalars and 0-d arrays are detected without importing numpy.
+    if hasattr(value, "ndim"):
+        return value.ndim == 0
+    return value is None or isinstance(value, (numbers.Number, str))
@@ -1,8 +1,293 @@
+import math
+import random
+
+
 class Sweep:
     """Sweep allows you to define a sweep over a specific configuration value.
 
-    By default, the product of all sweeps will be run at experiment time.
+    By default, the product of all sweeps will be run at experiment time.  Sweeps
+    may be placed at any depth of the config, i.e. in `config.optimizer.name`.
     """
 
     def __init__(self, items):
         self.items = items
+
+    def __len__(self):
+        return len(self.items)
+
+
+class Zip(Sweep):
+    """Zip sweeps over several configuration values in lock-step.
+
+    All `Zip` sweeps sharing a `group` advance together instead of being combined
+    into a product: the i-th config takes the i-th item of each of them.  The group
+    as a whole is combined with the other sweeps as usual.
+
+    Usage:
+    ```python
+    config.model_type = bocas.Zip("model", ["resnet50", "vit"])
+    config.batch_size = bocas.Zip("model", [256, 64])
+    config.seed = bocas.Sweep([0, 1, 2])  # 2 * 3 = 6 configs
+    ```
+
+    Args:
+        group: name shared by the sweeps to zip together.
+        items: values of this sweep.  Every sweep in a group must have the same
+            number of items.
+    """
+
+    def __init__(self, group, items):
+        super().__init__(items)
+        self.group = group
+
+
+class Distribution:
+    """Distribution is a range of values, drawn from by a search strategy.
+
+    Distributions are placed in a config like `bocas.Sweep`, and require a search
+    strategy to be passed to `bocas.run()`, i.e. `bocas.RandomSweep`.  Strategies
+    draw points of the unit hypercube, which each distribution maps to a value.
+    """
+
+    def from_unit(self, u):
+        """Returns the value at `u`, in `[0, 1)`."""
+        raise NotImplementedError
+
+    def to_unit(self, value):
+        """Returns the point of `[0, 1)` that `value` is drawn from."""
+        raise NotImplementedError
+
+
+class Uniform(Distribution):
+    """Uniform draws floats between `low` and `high`.
+
+    Usage:
+    ```python
+    config.learning_rate = bocas.Uniform(1e-4, 1e-1, log=True)
+    config.dropout = bocas.Uniform(0.0, 0.5)
+    ```
+
+    Args:
+        low: lower bound of the range.
+        high: upper bound of the range.
+        log: whether to draw uniformly on a log scale.  Requires `low > 0`.
+    """
+
+    def __init__(self, low, high, log=False):
+        if not low < high:
+            raise ValueError(f"Expected `low < high`, got low={low}, high={high}")
+        if log and low <= 0:
+            raise ValueError(
+                f"Expected `low` to be positive with `log=True`, got {low}"
+            )
+        self.low = low
+        self.high = high
+        self.log = log
+
+    def from_unit(self, u):
+        if self.log:
+            low, high = math.log(self.low), math.log(self.high)
+            return math.exp(low + u * (high - low))
+        return self.low + u * (self.high - self.low)
+
+    def to_unit(self, value):
+        if self.log:
+            low, high = math.log(self.low), math.log(self.high)
+            return (math.log(value) - low) / (high - low)
+        return (value - self.low) / (self.high - self.low)
+
+
+class IntUniform(Uniform):
+    """IntUniform draws integers between `low` and `high`, both included.
+
+    Args:
+        low: lower bound of the range.
+        high: upper bound of the range.
+        log: whether to draw uniformly on a log scale.  Requires `low > 0`.
+    """
+
+    def from_unit(self, u):
+        if self.log:
+            low, high = math.log(self.low - 0.5), math.log(self.high + 0.5)
+            value = round(math.exp(low + u * (high - low)))
+        else:
+            value = self.low + math.floor(u * (self.high - self.low + 1))
+        return int(min(max(value, self.low), self.high))
+
+    def to_unit(self, value):
+        if self.log:
+            low, high = math.log(self.low - 0.5), math.log(self.high + 0.5)
+            return (math.log(value) - low) / (high - low)
+        return (value - self.low + 0.5) / (self.high - self.low + 1)
+
+
+class Choice(Distribution):
+    """Choice draws one of `items`, each with the same probability."""
+
+    def __init__(self, items):
+        if not items:
+            raise ValueError("Expected `items` to contain at least one item.")
+        self.items = list(items)
+
+    def from_unit(self, u):
+        return self.items[min(int(u * len(self.items)), len(self.items) - 1)]
+
+    def to_unit(self, value):
+        return (self.items.index(value) + 0.5) / len(self.items)
+
+
+class RandomSweep:
+    """RandomSweep runs `budget` configs drawn at random from the distributions.
+
+    Random search covers large spaces far better than a grid of the same size,
+    since every config tries a new value of every parameter.  Draws only depend on
+    `seed`, so re-runs and distributed nodes draw the same configs.  Any
+    `bocas.Sweep` in the config is still expanded for each draw.
+
+    Usage:
+    ```python
+    config.learning_rate = bocas.Uniform(1e-4, 1e-1, log=True)
+    config.optimizer = bocas.Choice(["sgd", "adam"])
+    bocas.run("run.py", config, search=bocas.RandomSweep(budget=50))
+    ```
+
+    Args:
+        budget: number of configs to draw.
+        seed: seed of the draws.
+    """
+
+    adaptive = False
+
+    def __init__(self, budget, seed=0):
+        if budget < 1:
+            raise ValueError(f"Expected `budget` to be at least 1, got {budget}")
+        self.budget = budget
+        self.seed = seed
+
+    def points(self, dimensions, observations=None):
+        """Yields `budget` points of the unit hypercube with `dimensions` dimensions."""
+        rng = random.Random(self.seed)
+        for _ in range(self.budget):
+            yield tuple(rng.random() for _ in range(dimensions))
+
+
+class SobolSweep(RandomSweep):
+    """SobolSweep draws `budget` configs from a scrambled Sobol sequence.
+
+    Quasi-random points cover the space more evenly than random ones, leaving fewer
+    gaps for the same budget.  Budgets that are powers of 2 are best balanced.
+    Requires `scipy`.
+
+    Args:
+        budget: number of configs to draw.
+        seed: seed of the scrambling.
+    """
+
+    def points(self, dimensions, observations=None):
+        try:
+            from scipy.stats import qmc
+        except ImportError:
+            raise ImportError(
+                "`bocas.SobolSweep` requires `scipy`.  Install it with "
+                "`pip install scipy`."
+            )
+        sampler = qmc.Sobol(dimensions, scramble=True, seed=self.seed)
+        for point in sampler.random_base2(math.ceil(math.log2(self.budget)))[
+            : self.budget
+        ]:
+            yield tuple(float(u) for u in point)
+
+
+class AdaptiveSweep(RandomSweep):
+    """AdaptiveSweep draws configs where past results were best.
+
+    After `initial` random draws, each config is chosen like the Tree-structured
+    Parzen Estimator: completed configs are split into the best `gamma` fraction
+    and the rest, and of `candidates` points drawn around the best configs, the one
+    most likely under the best configs relative to the rest is run next.
+    `bocas.run()` feeds the `metric` of every completed result back in, and only
+    draws a config once a worker is free, so that it benefits from every result so
+    far.
+
+    Usage:
+    ```python
+    search = bocas.AdaptiveSweep("eval_metrics/accuracy", budget=40)
+    bocas.run("run.py", config, max_workers=4, search=search)
+    ```
+
+    Args:
+        metric: the metric to optimize, as `{artifact}/{metric}` of a scalar in a
+            `bocas.artifacts.Metrics` artifact, i.e. `eval_metrics/accuracy`.
+        budget: number of configs to draw.
+        mode: either "max" or "min".
+        initial: (Optional) number of random draws before draws adapt.  Defaults
+            to a fifth of the budget, and at least 4.
+        gamma: fraction of completed configs considered best.
+        candidates: number of candidates drawn for each config.
+        seed: seed of the draws.
+    """
+
+    adaptive = True
+
+    def __init__(
+        self,
+        metric,
+        budget,
+        mode="max",
+        initial=None,
+        gamma=0.25,
+        candidates=64,
+        seed=0,
+    ):
+        super().__init__(budget, seed=seed)
+        if mode not in ("max", "min"):
+            raise ValueError(f"Expected `mode` to be 'max' or 'min', got mode={mode}")
+        self.metric = metric
+        self.mode = mode
+        self.initial = max(4, budget // 5) if initial is None else initial
+        self.gamma = gamma
+        self.candidates = candidates
+
+    def points(self, dimensions, observations=None):
+        """Yields `budget` points, adapting to `(point, value)` in `observations`.
+
+        `observations` is filled in by the caller as results complete.
+        """
+        rng = random.Random(self.seed)
+        for i in range(self.budget):
+            if i < self.initial or not observations:
+                yield tuple(rng.random() for _ in range(dimensions))
+            else:
+                yield self._propose(rng, dimensions, observations)
+
+    def _propose(self, rng, dimensions, observations):
+        ranked = sorted(observations, key=lambda o: o[1], reverse=self.mode == "max")
+        n_good = max(1, math.ceil(self.gamma * len(ranked)))
+        good = [point for point, _ in ranked[:n_good]]
+        bad = [point for point, _ in ranked[n_good:]]
+        # Scott's rule, for the standard deviation of a uniform distribution.
+        bandwidth = 0.3 * len(ranked) ** (-1 / (dimensions + 4))
+
+        best, best_score = None, -math.inf
+        for _ in range(self.candidates):
+            center = rng.choice(good)
+            candidate = tuple(
+                min(max(rng.gauss(c, bandwidth), 0.0), 1.0 - 1e-12) for c in center
+            )
+            score = _density(candidate, good, bandwidth) / _density(
+                candidate, bad, bandwidth
+            )
+            if score > best_score:
+                best, best_score = candidate, score
+        return best
+
+
+def _density(point, centers, bandwidth):
+    """Gaussian kernel density of `centers` at `point`, mixed with a uniform prior."""
+    total = 1.0
+    for center in centers:
+        squared = sum((x - c) ** 2 for x, c in zip(point, center))
+        total += math.exp(-squared / (2 * bandwidth**2)) / (
+            (bandwidth * math.sqrt(2 * math.pi)) ** len(point)
+        )
+    return total / (len(centers) + 1)
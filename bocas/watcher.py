@@ -0,0 +1,228 @@
+import collections
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import threading
+import time
+
+from bocas.index import Index
+from bocas.result import LoadFailure, Result, _warn_load_failure
+
+WatchUpdate = collections.namedtuple("WatchUpdate", ["changed", "removed", "watcher"])
+WatchUpdate.__doc__ = """Results that were added, updated or removed since the last poll.
+
+`changed` is a list of `bocas.Result`, `removed` a list of result names and `watcher`
+the `Watcher` holding every result seen so far.
+"""
+
+
+class Watcher:
+    """Watcher keeps an up-to-date view of the results in an `artifact_dir`.
+
+    Each call to `poll()` only loads the results that were added or modified since
+    the previous one, as detected by `bocas.Index.refresh()`.  The flattened config
+    and metrics of each result are kept as well, so `collection()` builds a
+    `bocas.ResultCollection` without revisiting unchanged results.
+
+    Usage:
+    ```python
+    watcher = bocas.Watcher("artifacts/")
+    update = watcher.poll()
+    best = watcher.collection().best("eval_metrics/accuracy")
+    ```
+
+    Args:
+        artifact_dir: the directory holding the results.
+        compact: whether to compact the loaded results, see
+            `bocas.compaction.Compactor`.  Defaults to `True`.
+    """
+
+    def __init__(self, artifact_dir, compact=True):
+        from bocas.compaction import Compactor
+
+        self.artifact_dir = artifact_dir
+        self.index = Index(artifact_dir)
+        self.results = {}
+        self._rows = {}
+        self._collection = None
+        self._compactor = Compactor() if compact else None
+
+    def poll(self):
+        """Loads the results that changed since the last poll.
+
+        Returns:
+            a `WatchUpdate`, or `None` if nothing changed.
+        """
+        changed = {}
+        self.index.refresh(on_change=lambda name, r: changed.__setitem__(name, r))
+        names = set(self.index.names())
+        # Results that were already indexed when the watcher started.
+        for name in sorted(names - set(self.results) - set(changed)):
+            path = os.path.join(self.artifact_dir, name)
+            try:
+                changed[name] = Result.load(path)
+            except Exception as e:
+                _warn_load_failure(LoadFailure(path, e))
+        removed = [name for name in self.results if name not in names]
+        if not changed and not removed:
+            return None
+
+        from bocas.result_collection import result_row
+
+        for name in removed:
+            del self.results[name]
+            del self._rows[name]
+        for name, result in changed.items():
+            if self._compactor is not None:
+                result = self._compactor.compact(result)
+            changed[name] = result
+            self.results[name] = result
+            self._rows[name] = result_row(result)
+        self._collection = None
+        return WatchUpdate(list(changed.values()), removed, self)
+
+    def collection(self):
+        """Returns a `bocas.ResultCollection` of every result, sorted by name."""
+        if self._collection is None:
+            from bocas.result_collection import ResultCollection
+
+            names = sorted(self.results)
+            self._collection = ResultCollection.from_rows(
+                [self.results[name] for name in names],
+                [self._rows[name] for name in names],
+            )
+        return self._collection
+
+    def close(self):
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def watch(artifact_dir, callback, interval=5.0, compact=True, stop=None):
+    """Calls `callback` with a `WatchUpdate` whenever the results of a sweep change.
+
+    On Linux, changes are picked up through inotify as soon as they are written.
+    Elsewhere, `artifact_dir` is polled every `interval` seconds.  Blocks until
+    `stop` is set, or the process is interrupted.
+
+    Usage:
+    ```python
+    def update(update):
+        results = update.watcher.collection()
+        print(results.best("eval_metrics/accuracy").name)
+
+    bocas.watch("artifacts/", update)
+    ```
+
+    Args:
+        artifact_dir: the directory holding the results.
+        callback: callable accepting a `WatchUpdate`.
+        interval: seconds between polls.  With inotify, the longest time to wait for
+            an event before polling anyway.
+        compact: whether to compact the loaded results, see `Watcher`.
+        stop: (Optional) `threading.Event` that stops watching once set.
+    """
+    stop = stop or threading.Event()
+    notifier = _Inotify.create()
+    with Watcher(artifact_dir, compact=compact) as watcher:
+        try:
+            while not stop.is_set():
+                if notifier is not None:
+                    notifier.watch_tree(artifact_dir)
+                update = watcher.poll()
+                if update is not None:
+                    callback(update)
+                _wait(notifier, stop, interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if notifier is not None:
+                notifier.close()
+
+
+def _wait(notifier, stop, interval):
+    if notifier is None:
+        stop.wait(interval)
+        return
+    # Wakes up every second to check `stop`, but only returns early on an event.
+    deadline = time.monotonic() + interval
+    while not stop.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or notifier.wait(min(remaining, 1.0)):
+            return
+
+
+class _Inotify:
+    """Minimal inotify bindings, used to wake `watch()` up when files change."""
+
+    _MASK = (
+        0x00000008  # IN_CLOSE_WRITE
+        | 0x00000080  # IN_MOVED_TO
+        | 0x00000100  # IN_CREATE
+        | 0x00000200  # IN_DELETE
+        | 0x00000040  # IN_MOVED_FROM
+    )
+
+    def __init__(self, libc, fd):
+        self._libc = libc
+        self._fd = fd
+        self._watched = set()
+
+    @classmethod
+    def create(cls):
+        """Returns an `_Inotify`, or `None` if inotify isn't available."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        return cls(libc, fd)
+
+    def watch_tree(self, artifact_dir):
+        """Watches `artifact_dir` and each of its result directories."""
+        paths = [artifact_dir] + [
+            entry.path
+            for entry in os.scandir(artifact_dir)
+            if entry.is_dir() and not entry.name.startswith(".")
+        ]
+        for path in paths:
+            if path in self._watched:
+                continue
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(path), ctypes.c_uint32(self._MASK)
+            )
+            if wd >= 0:
+                self._watched.add(path)
+
+    def wait(self, timeout):
+        """Blocks until an event arrives or `timeout` seconds pass.
+
+        Returns:
+            whether any event arrived.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        # Drain the events, `watch()` rescans the directory anyway.
+        try:
+            while os.read(self._fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        # Watches on deleted directories are removed by the kernel.
+        self._watched = {path for path in self._watched if os.path.isdir(path)}
+        return True
+
+    def close(self):
+        os.close(self._fd)
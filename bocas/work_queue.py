@@ -0,0 +1,154 @@
+import os
+import socket
+import threading
+import time
+import uuid
+
+from termcolor import cprint
+
+from bocas.index import INDEX_DIR
+from bocas.writer import atomic_write
+
+QUEUE_DIR = "queue"
+LEASE_SUFFIX = ".lease"
+DONE_SUFFIX = ".done"
+
+
+class WorkQueue:
+    """WorkQueue lets several `bocas.run()` invocations drain one sweep together.
+
+    Every node expands the same sweep, and the hash of each expanded config serves
+    as its work item.  Before running a config, a node claims it by creating a lease
+    file in `artifact_dir/.bocas/queue/` with `O_EXCL`, so exactly one node holds
+    each item.  Leases are kept alive by a heartbeat thread that touches them; a
+    lease that hasn't been touched for `lease_timeout` seconds belongs to a dead
+    node and may be reclaimed by another one.  Finished items are recorded with a
+    `.done` marker naming their result.
+
+    The queue only relies on atomic file creation and renames, so it works on any
+    filesystem shared between the nodes that provides those, i.e. NFS.
+
+    Args:
+        artifact_dir: the `artifact_dir` shared by every node.
+        task_fingerprint: fingerprint of the task, see `bocas.cache`.  Items are
+            only considered done by results of the same version of the task.
+        lease_timeout: seconds after which a lease that wasn't renewed is stale.
+            Should comfortably exceed any clock skew between the nodes.
+    """
+
+    def __init__(self, artifact_dir, task_fingerprint=None, lease_timeout=300):
+        if lease_timeout <= 0:
+            raise ValueError(
+                f"Expected `lease_timeout` to be positive, got {lease_timeout}"
+            )
+        self.directory = os.path.join(artifact_dir, INDEX_DIR, QUEUE_DIR)
+        os.makedirs(self.directory, exist_ok=True)
+        self.task_fingerprint = task_fingerprint or ""
+        self.lease_timeout = lease_timeout
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._held = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self._beat, daemon=True)
+        self._heartbeat.start()
+
+    def claim(self, item):
+        """Tries to take the lease on `item`, reclaiming it if its lease is stale.
+
+        Returns:
+            whether this node now holds the lease.
+        """
+        path = self._path(item, LEASE_SUFFIX)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._reclaim_if_stale(path):
+                    return False
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(self.owner)
+            with self._lock:
+                self._held.add(item)
+            return True
+        return False
+
+    def release(self, item):
+        with self._lock:
+            self._held.discard(item)
+        try:
+            os.remove(self._path(item, LEASE_SUFFIX))
+        except FileNotFoundError:
+            pass
+
+    def complete(self, item, result_name):
+        """Marks `item` as done, producing the result named `result_name`."""
+        atomic_write(
+            self._path(item, DONE_SUFFIX), f"{self.task_fingerprint}\n{result_name}\n"
+        )
+        self.release(item)
+
+    def done(self, item):
+        """Returns the name of the result produced for `item`, or `None`."""
+        try:
+            with open(self._path(item, DONE_SUFFIX), "r") as f:
+                fingerprint, result_name = f.read().splitlines()[:2]
+        except (FileNotFoundError, ValueError):
+            return None
+        if fingerprint != self.task_fingerprint:
+            return None
+        return result_name
+
+    def close(self):
+        """Stops the heartbeat and releases every lease still held."""
+        self._stopped.set()
+        self._heartbeat.join()
+        with self._lock:
+            held = list(self._held)
+        for item in held:
+            self.release(item)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _path(self, item, suffix):
+        return os.path.join(self.directory, f"{item}{suffix}")
+
+    def _reclaim_if_stale(self, path):
+        """Removes the lease at `path` if it is stale.  Returns whether it is gone."""
+        try:
+            if time.time() - os.stat(path).st_mtime < self.lease_timeout:
+                return False
+        except FileNotFoundError:
+            return True
+        # Renaming is atomic, so only one node moves the stale lease out of the way.
+        stale_path = f"{path}.{uuid.uuid4().hex[:8]}.stale"
+        try:
+            os.rename(path, stale_path)
+        except FileNotFoundError:
+            return True
+        # Another node may have replaced the lease between `stat()` and `rename()`,
+        # in which case the moved lease is live and is put back.
+        if time.time() - os.stat(stale_path).st_mtime < self.lease_timeout:
+            try:
+                os.link(stale_path, path)
+            except FileExistsError:
+                pass
+            os.remove(stale_path)
+            return False
+        os.remove(stale_path)
+        cprint(f"Reclaimed stale lease {os.path.basename(path)}.", "yellow")
+        return True
+
+    def _beat(self):
+        while not self._stopped.wait(self.lease_timeout / 4):
+            with self._lock:
+                held = list(self._held)
+            for item in held:
+                try:
+                    os.utime(self._path(item, LEASE_SUFFIX))
+                except FileNotFoundError:
+                    cprint(f"Lost the lease on {item}.", "red")
@@ -0,0 +1,101 @@
+import os
+import queue
+import tempfile
+import threading
+
+from termcolor import cprint
+
+
+def atomic_write(path, data):
+    """Writes `data` to `path` by writing a temporary file and renaming it.
+
+    Readers either see the previous contents of `path` or the new ones, never a
+    partially written file.
+
+    Args:
+        path: destination file.
+        data: `str` or `bytes` to write.
+    """
+    directory, filename = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{filename}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ResultWriter:
+    """ResultWriter persists results on a background thread.
+
+    `bocas.run()` submits each result to the writer as soon as its task returns, so
+    the next config starts while the previous result is still being serialized.
+    Errors raised while writing are collected and raised by `close()`.
+
+    Args:
+        write_fn: callable invoked on the writer thread with the arguments passed to
+            `submit()`.
+        max_pending: maximum number of results waiting to be written.  `submit()`
+            blocks once this many results are queued, bounding memory usage.
+    """
+
+    def __init__(self, write_fn, max_pending=2):
+        self.write_fn = write_fn
+        self.errors = []
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def submit(self, *args):
+        if not self._thread.is_alive():
+            raise ValueError("Cannot submit results to a closed `ResultWriter`.")
+        self._queue.put(args)
+
+    def flush(self):
+        """Blocks until every submitted result has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Flushes the writer, stops its thread and raises any error encountered."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self.errors:
+            raise RuntimeError(
+                f"Failed to write {len(self.errors)} result(s).  First error: "
+                f"{self.errors[0]!r}"
+            ) from self.errors[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+            return
+        # Still persist the results that were completed before the error, but let
+        # the original exception propagate.
+        try:
+            self.close()
+        except RuntimeError as e:
+            cprint(str(e), "red")
+
+    def _work(self):
+        while True:
+            args = self._queue.get()
+            try:
+                if args is None:
+                    return
+                self.write_fn(*args)
+            except Exception as e:
+                cprint(f"Failed to write result: {e}.", "red")
+                self.errors.append(e)
+            finally:
+                self._queue.task_done()
@@ -1,6 +1,22 @@
 import yaml
 
 
+def as_numeric_array(values):
+    """Converts a list of numbers to a `np.ndarray`, leaving other values untouched.
+
+    Artifacts use this in `to_yaml()` so that their numeric payloads are stored in
+    binary sidecars instead of as YAML scalars.
+    """
+    if not isinstance(values, (list, tuple)) or len(values) == 0:
+        return values
+    import numpy as np
+
+    array = np.asarray(values)
+    if array.dtype.kind not in "biufc":
+        return values
+    return array
+
+
 def parse_yaml_node(loader, node):
     if isinstance(node, yaml.MappingNode):
         # Recursively process key-value pairs
@@ -1,7 +1,101 @@
+import io
+import os
+import sys
+
 import yaml
-import numpy as np
-import ml_collections
-from bocas.artifacts import Artifact, KerasHistory, Metrics
+from bocas.artifacts import Artifact, KerasHistory, LazyArtifact, Metrics, Profile
+
+# Use the libyaml bindings when PyYAML was built against them, they are an order of
+# magnitude faster than the pure Python implementation.
+_BaseLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_BaseDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+SIDECAR_DIR = "arrays"
+# Numeric arrays with fewer elements than this are inlined into the YAML document,
+# a sidecar file isn't worth its open and its inode for them.
+SIDECAR_MIN_SIZE = 256
+# Results store each of their artifacts in a separate file under this directory.
+ARTIFACTS_DIR = "artifacts"
+
+
+class Loader(_BaseLoader):
+    """YAML Loader used to read `bocas` results.
+
+    All constructors are registered on this class instead of the global `yaml`
+    defaults, so loading results never changes the behavior of `yaml.load()`.
+    """
+
+    # Directory that `!ndarray` sidecar paths are relative to.
+    sidecar_dir = None
+    # When set, called with the path of each `!ndarray` sidecar to read it instead.
+    sidecar_reader = None
+    # Loads the files referenced by `!ArtifactRef`s, see `bocas.artifacts.LazyArtifact`.
+    artifact_source = None
+    # Names of the referenced artifacts to load, or `None` to load all of them.
+    artifact_names = None
+
+
+class Dumper(_BaseDumper):
+    """YAML Dumper used to write `bocas` results."""
+
+    # When set, numeric arrays of at least `SIDECAR_MIN_SIZE` elements are written to
+    # `.npy` files in this directory instead of being inlined into the YAML document.
+    sidecar_dir = None
+
+
+def dump(data, stream=None, sidecar_dir=None, sidecar_subdir=SIDECAR_DIR):
+    """Dumps `data` to YAML.
+
+    Args:
+        data: the object to serialize.
+        stream: (Optional) file-like object to write to.  If `None`, the YAML
+            document is returned as a string.
+        sidecar_dir: (Optional) directory to store numeric arrays of at least
+            `SIDECAR_MIN_SIZE` elements in, as binary `.npy` files under
+            `sidecar_dir/sidecar_subdir/`.
+        sidecar_subdir: path of the array files relative to `sidecar_dir`.  Defaults
+            to "arrays".
+    """
+    output = stream if stream is not None else io.StringIO()
+    _configure_imported_representers(Dumper)
+    dumper = Dumper(output, default_flow_style=False)
+    dumper.sidecar_dir = sidecar_dir
+    dumper.sidecar_subdir = sidecar_subdir
+    dumper.sidecar_count = 0
+    try:
+        dumper.open()
+        dumper.represent(data)
+        dumper.close()
+    finally:
+        dumper.dispose()
+    if stream is None:
+        return output.getvalue()
+
+
+def load(
+    stream, sidecar_dir=None, sidecar_reader=None, artifact_source=None, artifacts=None
+):
+    """Loads a YAML document, resolving `!ndarray` sidecars relative to `sidecar_dir`.
+
+    Sidecar arrays are read into memory, so that no file stays open once a result
+    is loaded, no matter how many results are held at once.  Alternatively,
+    `sidecar_reader` may be a callable that receives the relative path of each
+    sidecar and returns its array, i.e. to read sidecars from an archive.
+
+    `!ArtifactRef` references are loaded through `artifact_source`.  If `artifacts`
+    is given, only the artifacts with those names are loaded, the others are left as
+    `bocas.artifacts.LazyArtifact`.
+    """
+    loader = Loader(stream)
+    loader.sidecar_dir = sidecar_dir
+    loader.sidecar_reader = sidecar_reader
+    loader.artifact_source = artifact_source
+    loader.artifact_names = None if artifacts is None else set(artifacts)
+    try:
+        return loader.get_single_data()
+    finally:
+        loader.dispose()
 
 
 def contains_only_registered_tags(yaml_str):
@@ -9,39 +103,94 @@ def contains_only_registered_tags(yaml_str):
 
 
 def numpy_scalar_representer(dumper, data):
-    return dumper.represent_scalar("tag:yaml.org,2002:float", str(data.item()))
+    return dumper.represent_data(data.item())
 
 
 def numpy_array_representer(dumper, data):
-    if isinstance(data, np.ndarray):
-        return dumper.represent_sequence(
-            "tag:yaml.org,2002:seq", data.tolist(), flow_style=False
-        )
-    elif isinstance(data, np.core.multiarray.scalar):
-        return numpy_scalar_representer(dumper, data)
+    if data.ndim == 0:
+        return dumper.represent_data(data.item())
+    if (
+        getattr(dumper, "sidecar_dir", None) is not None
+        and data.dtype.kind in "biufc"
+        and data.size >= SIDECAR_MIN_SIZE
+    ):
+        return numpy_sidecar_representer(dumper, data)
+    return dumper.represent_sequence(
+        "tag:yaml.org,2002:seq", data.tolist(), flow_style=False
+    )
+
+
+def numpy_sidecar_representer(dumper, data):
+    import numpy as np
+
+    path = os.path.join(dumper.sidecar_subdir, f"{dumper.sidecar_count:04d}.npy")
+    dumper.sidecar_count += 1
+    os.makedirs(os.path.join(dumper.sidecar_dir, dumper.sidecar_subdir), exist_ok=True)
+    np.save(os.path.join(dumper.sidecar_dir, path), data, allow_pickle=False)
+    return dumper.represent_scalar("!ndarray", path)
 
 
 def numpy_float32_representer(dumper, data):
     return dumper.represent_scalar("!np.float32", str(data))
 
 
+def tuple_representer(dumper, data):
+    return dumper.represent_sequence("tag:yaml.org,2002:python/tuple", list(data))
+
+
 def config_dict_representer(dumper, data):
     return dumper.represent_mapping("!ConfigDict", data.to_dict())
 
 
 def config_dict_constructor(loader, node):
-    fields = loader.construct_mapping(node)
+    import ml_collections
+
+    # Nested sections are only filled in after they are wrapped, unless `deep=True`.
+    fields = loader.construct_mapping(node, deep=True)
     return ml_collections.ConfigDict(fields)
 
 
 def numpy_float32_constructor(loader, node):
+    import numpy as np
+
     value = loader.construct_scalar(node)
     return np.array([value]).astype(np.float32)[0]
 
 
+def numpy_sidecar_constructor(loader, node):
+    path = loader.construct_scalar(node)
+    if loader.sidecar_reader is not None:
+        return loader.sidecar_reader(path)
+    if loader.sidecar_dir is None:
+        raise ValueError(
+            f"Found a reference to the array sidecar `{path}`, but no `sidecar_dir` "
+            "or `sidecar_reader` was passed to `bocas.yamlify.load()`."
+        )
+    import numpy as np
+
+    # Not memory-mapped: each mapping keeps a file descriptor open for as long as
+    # the array lives, and a large collection would run out of them.
+    return np.load(os.path.join(loader.sidecar_dir, path), allow_pickle=False)
+
+
+def artifact_ref_constructor(loader, node):
+    fields = loader.construct_mapping(node)
+    artifact = LazyArtifact(fields["name"], fields["path"], loader.artifact_source)
+    if loader.artifact_names is None or artifact.name in loader.artifact_names:
+        return artifact.materialize()
+    return artifact
+
+
+def tuple_constructor(loader, node):
+    return tuple(loader.construct_sequence(node))
+
+
 def base_representer(tag):
     def representer(dumper, data):
-        return dumper.represent_mapping(tag, data.to_yaml())
+        fields = data.to_yaml()
+        # `to_yaml()` may convert values to arrays, importing `numpy` mid-dump.
+        _configure_imported_representers(type(dumper))
+        return dumper.represent_mapping(tag, fields)
 
     return representer
 
@@ -53,24 +202,81 @@ def base_constructor(cls):
     return constructor
 
 
-def configure_dumper():
-    yaml.add_representer(np.float32, numpy_float32_representer)
-    yaml.add_representer(np.ndarray, numpy_array_representer)
-    yaml.add_representer(np.core.multiarray.scalar, numpy_scalar_representer)
-    yaml.add_representer(ml_collections.ConfigDict, config_dict_representer)
-    yaml.add_representer(Artifact, base_representer(Artifact.yaml_tag))
-    yaml.add_representer(KerasHistory, base_representer(KerasHistory.yaml_tag))
-    yaml.add_representer(Metrics, base_representer(Metrics.yaml_tag))
+def configure_numpy_dumper(dumper=Dumper):
+    import numpy as np
+
+    dumper.add_representer(np.float32, numpy_float32_representer)
+    # Multi representer, so that memory-mapped arrays are handled as well.
+    dumper.add_multi_representer(np.ndarray, numpy_array_representer)
+    dumper.add_multi_representer(np.generic, numpy_scalar_representer)
+
+
+def configure_config_dict_dumper(dumper=Dumper):
+    import ml_collections
+
+    dumper.add_representer(ml_collections.ConfigDict, config_dict_representer)
+
+
+# Representers for third party types, keyed by the module defining those types.
+# Objects of these types can only exist once their module has been imported, so
+# `dump()` registers them lazily to keep `import bocas` lightweight.
+_THIRD_PARTY_DUMPERS = {
+    "numpy": configure_numpy_dumper,
+    "ml_collections": configure_config_dict_dumper,
+}
+_configured_dumpers = set()
+
+
+def _configure_imported_representers(dumper):
+    for module, configure in _THIRD_PARTY_DUMPERS.items():
+        if module in sys.modules and (dumper, module) not in _configured_dumpers:
+            configure(dumper)
+            _configured_dumpers.add((dumper, module))
+
+
+def configure_dumper(dumper=Dumper, lazy=False):
+    """Registers the `bocas` representers on `dumper`.
+
+    Args:
+        dumper: the `yaml.Dumper` class to configure.
+        lazy: if `True`, the representers for `numpy` and `ml_collections` types are
+            registered by `bocas.yamlify.dump()` once those modules are imported,
+            instead of importing them now.
+    """
+    dumper.add_representer(tuple, tuple_representer)
+    dumper.add_representer(Artifact, base_representer(Artifact.yaml_tag))
+    dumper.add_representer(KerasHistory, base_representer(KerasHistory.yaml_tag))
+    dumper.add_representer(Metrics, base_representer(Metrics.yaml_tag))
+    dumper.add_representer(Profile, base_representer(Profile.yaml_tag))
+    dumper.add_representer(LazyArtifact, base_representer(LazyArtifact.yaml_tag))
+    if not lazy:
+        for module, configure in _THIRD_PARTY_DUMPERS.items():
+            configure(dumper)
+            _configured_dumpers.add((dumper, module))
+
+
+def configure_loader(loader=Loader):
+    # Constructors import `numpy` and `ml_collections` when a tag is encountered.
+    loader.add_constructor("!np.float32", numpy_float32_constructor)
+    loader.add_constructor("!ConfigDict", config_dict_constructor)
+    loader.add_constructor("!ndarray", numpy_sidecar_constructor)
+    # Results written by the default `yaml.Dumper` may contain python tuples.
+    loader.add_constructor("tag:yaml.org,2002:python/tuple", tuple_constructor)
+    loader.add_constructor(Artifact.yaml_tag, base_constructor(Artifact))
+    loader.add_constructor(KerasHistory.yaml_tag, base_constructor(KerasHistory))
+    loader.add_constructor(Metrics.yaml_tag, base_constructor(Metrics))
+    loader.add_constructor(Profile.yaml_tag, base_constructor(Profile))
+    loader.add_constructor(LazyArtifact.yaml_tag, artifact_ref_constructor)
+
 
+def configure_custom_yaml(loader=Loader, dumper=Dumper):
+    """Registers the `bocas` representers and constructors on `loader` and `dumper`.
 
-def configure_loader():
-    yaml.add_constructor("!np.float32", numpy_float32_constructor)
-    yaml.add_constructor("!ConfigDict", config_dict_constructor)
-    yaml.add_constructor(Artifact.yaml_tag, base_constructor(Artifact))
-    yaml.add_constructor(KerasHistory.yaml_tag, base_constructor(KerasHistory))
-    yaml.add_constructor(Metrics.yaml_tag, base_constructor(Metrics))
+    By default, this configures `bocas.yamlify.Loader` and `bocas.yamlify.Dumper`.
+    """
+    configure_dumper(dumper)
+    configure_loader(loader)
 
 
-def configure_custom_yaml():
-    configure_dumper()
-    configure_loader()
+configure_dumper(Dumper, lazy=True)
+configure_loader(Loader)
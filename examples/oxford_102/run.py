@@ -121,6 +121,23 @@ def prepare_dataset(ds, augmentation):
     return ds
 
 
+"""
+Every model is trained on the same datasets, so loading them only depends on the
+augmenter.  `bocas.cached_stage` memoizes the stage under the config keys it depends
+on, so configs that share an `augmenter_type` load the datasets once:
+"""
+
+
+@bocas.cached_stage(keys=["augmenter_type"])
+def load_datasets(config):
+    train_ds, test_ds = tfds.load(
+        "oxford_flowers102", as_supervised=True, split=["train", "test"]
+    )
+    train_ds = prepare_dataset(train_ds, augmentation=config.augmenter_type)
+    test_ds = prepare_dataset(test_ds, augmentation="eval")
+    return train_ds, test_ds
+
+
 """
 And define our entrypoint.  In `bocas`, the entrypoint to a run is called
 `run()`.
@@ -138,11 +155,7 @@ def run(config):
 
     callbacks = [keras.callbacks.TensorBoard(config.log_dir)]
 
-    train_ds, test_ds = tfds.load(
-        "oxford_flowers102", as_supervised=True, split=["train", "test"]
-    )
-    train_ds = prepare_dataset(train_ds, augmentation=config.augmenter_type)
-    test_ds = prepare_dataset(test_ds, augmentation="eval")
+    train_ds, test_ds = load_datasets(config)
 
     history = model.fit(train_ds, epochs=10, callbacks=callbacks)
     metrics = model.evaluate(test_ds, return_dict=True)
@@ -3,12 +3,10 @@ import pandas as pd
 
 import bocas
 
-results = bocas.Result.load_collection("artifacts/")
-
 metrics_to_plot = {}
 
-for experiment in results:
-    metrics = experiment.get_artifact("fit_history").metrics
+for experiment in bocas.Result.iter_collection("artifacts/"):
+    metrics = experiment.get("fit_history").metrics
 
     metrics_to_plot[f"{experiment.name} Train"] = metrics["accuracy"]
     metrics_to_plot[f"{experiment.name} Validation"] = metrics["val_accuracy"]
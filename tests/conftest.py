@@ -0,0 +1,28 @@
+import importlib
+import os
+
+import ml_collections
+import pytest
+
+import bocas
+
+# `bocas.run` is the function, the module holds the sweep internals.
+run_module = importlib.import_module("bocas.run")
+
+
+@pytest.fixture
+def write_result():
+    """Returns a function writing a result with a `Metrics` artifact to disk."""
+
+    def write(artifact_dir, name, config=None, **metrics):
+        result = bocas.Result(
+            name,
+            artifacts=[bocas.artifacts.Metrics(metrics, name="metrics")],
+            config=ml_collections.ConfigDict(config or {}),
+        )
+        result_dir = os.path.join(str(artifact_dir), name)
+        os.makedirs(result_dir, exist_ok=True)
+        run_module.serialize_yaml(result, result_dir)
+        return result_dir
+
+    return write
@@ -0,0 +1,15 @@
+import subprocess
+import sys
+
+
+def test_import_bocas_skips_heavy_dependencies():
+    code = (
+        "import sys, bocas; "
+        "print(','.join(m for m in ('tensorflow', 'numpy', 'ml_collections') "
+        "if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert output.stdout.strip() == ""
@@ -0,0 +1,54 @@
+import ml_collections
+
+import bocas
+from bocas import cache
+
+TASK = """
+import bocas
+
+
+def run(config):
+    with open(config.log, "a") as f:
+        f.write(f"{config.a}\\n")
+    return bocas.Result(name=f"a={config.a}", artifacts=[])
+"""
+
+
+def launch(tmp_path, **kwargs):
+    config = ml_collections.ConfigDict()
+    config.log = str(tmp_path / "calls.txt")
+    config.a = bocas.Sweep([1, 2])
+    bocas.run(
+        str(tmp_path / "run.py"),
+        config,
+        artifact_dir=str(tmp_path / "artifacts"),
+        **kwargs,
+    )
+    calls = (tmp_path / "calls.txt").read_text().split()
+    (tmp_path / "calls.txt").write_text("")
+    return calls
+
+
+def test_config_hash_ignores_key_order():
+    a = ml_collections.ConfigDict({"lr": 0.1, "model": {"depth": 2}})
+    b = ml_collections.ConfigDict({"model": {"depth": 2}, "lr": 0.1})
+
+    assert cache.config_hash(a) == cache.config_hash(b)
+    assert cache.config_hash(a) != cache.config_hash({"lr": 0.2, "model": {"depth": 2}})
+
+
+def test_task_fingerprint_is_none_without_source():
+    task = eval("lambda config: None")
+
+    assert cache.task_fingerprint(task) is None
+
+
+def test_cached_results_are_reused_until_the_task_changes(tmp_path):
+    (tmp_path / "run.py").write_text(TASK)
+    assert launch(tmp_path) == ["1", "2"]
+    assert launch(tmp_path) == []
+    assert launch(tmp_path, force=True) == ["1", "2"]
+
+    (tmp_path / "run.py").write_text(TASK + "\n# Edited.\n")
+    assert launch(tmp_path) == ["1", "2"]
+    assert launch(tmp_path, use_cache=False) == ["1", "2"]
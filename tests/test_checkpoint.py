@@ -0,0 +1,58 @@
+import os
+
+import ml_collections
+import pytest
+
+import bocas
+from bocas import checkpoint
+
+interrupt = [True]
+
+
+def task(config):
+    ckpt = bocas.Checkpoint("resumable")
+    state = ckpt.restore() or {"epoch": 0}
+    for epoch in range(state["epoch"], 4):
+        state["epoch"] = epoch + 1
+        ckpt.save(state)
+        if epoch == 1 and interrupt[0]:
+            raise KeyboardInterrupt
+    return bocas.Result(
+        "resumable",
+        artifacts=[
+            bocas.artifacts.Metrics(
+                {"resumed": ckpt.restored is not None}, name="metrics"
+            )
+        ],
+    )
+
+
+def test_only_the_latest_checkpoints_are_kept(tmp_path):
+    ckpt = checkpoint.Checkpoint("r", artifact_dir=str(tmp_path), keep=2)
+    assert ckpt.restore() is None
+
+    for epoch in range(3):
+        ckpt.save({"epoch": epoch}, files={"weights": lambda p: open(p, "w").close()})
+
+    assert checkpoint.Checkpoint("r", artifact_dir=str(tmp_path)).restore() == {
+        "epoch": 2
+    }
+    assert len(os.listdir(ckpt.directory)) == 3  # Two generations and `LATEST`.
+    with pytest.raises(ValueError, match="restore"):
+        ckpt.path("weights")
+
+    ckpt.clear()
+    assert ckpt.restore() is None
+
+
+def test_interrupted_configs_resume_and_drop_their_checkpoint(tmp_path):
+    config = ml_collections.ConfigDict({"lr": 0.1})
+    interrupt[0] = True
+    with pytest.raises(KeyboardInterrupt):
+        bocas.run(task, config, artifact_dir=str(tmp_path))
+
+    interrupt[0] = False
+    (result,) = bocas.run(task, config, artifact_dir=str(tmp_path))
+
+    assert result.get("metrics").metrics == {"resumed": True}
+    assert not os.path.exists(tmp_path / "resumable" / checkpoint.CHECKPOINT_DIR)
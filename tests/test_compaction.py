@@ -0,0 +1,27 @@
+import ml_collections
+import numpy as np
+
+import bocas
+from bocas.compaction import Compactor
+
+
+def result(seed):
+    config = ml_collections.ConfigDict()
+    config.seed = seed
+    config.optimizer = ml_collections.ConfigDict({"name": "adam", "lr": 0.1})
+    return bocas.Result(
+        f"seed={seed}",
+        artifacts=[bocas.artifacts.KerasHistory({"loss": [2.0, 1.0]}, name="fit")],
+        config=config,
+    )
+
+
+def test_compacted_results_share_equal_sections_and_hold_arrays():
+    compactor = Compactor()
+    a, b = compactor.compact(result(0)), compactor.compact(result(1))
+
+    assert a.config.optimizer is b.config.optimizer
+    assert a.config.optimizer.lr == 0.1
+    assert (a.config.seed, b.config.seed) == (0, 1)
+    assert isinstance(a.get("fit").history["loss"], np.ndarray)
+    assert list(b.get("fit").history["loss"]) == [2.0, 1.0]
@@ -0,0 +1,30 @@
+import pytest
+
+from bocas import artifacts
+
+
+def test_tail_skips_partial_lines_and_resumes_from_offset(tmp_path):
+    path = tmp_path / artifacts.history_log.HISTORY_LOG
+    path.write_text('{"epoch": 0, "loss": 2.0}\n{"epoch": 1, "lo')
+
+    records, offset = artifacts.tail_history_log(str(path))
+    assert records == [{"epoch": 0, "loss": 2.0}]
+
+    with open(path, "a") as f:
+        f.write('ss": 1.0}\n')
+    records, _ = artifacts.tail_history_log(str(path), offset)
+    assert records == [{"epoch": 1, "loss": 1.0}]
+
+
+def test_streaming_history_keeps_the_last_record_of_resumed_epochs(tmp_path):
+    pytest.importorskip("tensorflow")
+    history = artifacts.StreamingKerasHistory(str(tmp_path))
+    history.on_train_begin()
+    history.on_epoch_end(0, {"loss": 3.0})
+    history.on_epoch_end(1, {"loss": 2.0})
+
+    resumed = artifacts.StreamingKerasHistory(str(tmp_path), append=True)
+    resumed.on_train_begin()
+    resumed.on_epoch_end(1, {"loss": 1.5})
+
+    assert resumed.to_artifact(name="fit_history").history == {"loss": [3.0, 1.5]}
@@ -0,0 +1,23 @@
+from bocas.importing import import_file
+
+
+def test_files_are_imported_as_separate_modules(tmp_path):
+    (tmp_path / "a.py").write_text("NAME = 'a'\n\ndef name():\n    return NAME\n")
+    (tmp_path / "b.py").write_text("NAME = 'b'\nONLY_B = True\n")
+
+    a = import_file(str(tmp_path / "a.py"))
+    b = import_file(str(tmp_path / "b.py"))
+
+    assert a is not b
+    assert a.name() == "a"
+    assert b.NAME == "b"
+    assert not hasattr(a, "ONLY_B")
+
+
+def test_reimporting_a_file_picks_up_its_changes(tmp_path):
+    path = tmp_path / "task"
+    path.write_text("VERSION = 1\n")
+    assert import_file(str(path)).VERSION == 1
+
+    path.write_text("VERSION = 20\n")
+    assert import_file(str(path)).VERSION == 20
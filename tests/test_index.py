@@ -0,0 +1,38 @@
+import os
+import shutil
+
+import bocas
+
+
+def test_refresh_only_parses_changed_results(tmp_path, write_result):
+    write_result(tmp_path, "a", {"model": "resnet"}, accuracy=0.5)
+    write_result(tmp_path, "b", {"model": "vit"}, accuracy=0.7)
+
+    with bocas.Index(str(tmp_path)) as index:
+        assert sorted(index.refresh()) == ["a", "b"]
+        assert index.refresh() == []
+
+        result_dir = write_result(tmp_path, "a", {"model": "resnet"}, accuracy=0.9)
+        os.utime(
+            os.path.join(result_dir, "results.yaml"),
+            ns=(0, os.stat(result_dir).st_mtime_ns + 10**9),
+        )
+        shutil.rmtree(tmp_path / "b")
+        assert index.refresh() == ["a"]
+        assert index.names() == ["a"]
+
+
+def test_query_filters_on_config_and_metrics(tmp_path, write_result):
+    write_result(tmp_path, "a", {"model": "resnet", "lr": 0.1}, accuracy=0.5)
+    write_result(tmp_path, "b", {"model": "resnet", "lr": 0.01}, accuracy=0.7)
+    write_result(tmp_path, "c", {"model": "vit", "lr": 0.1}, accuracy=0.9)
+
+    with bocas.Index(str(tmp_path), in_memory=True) as index:
+        index.refresh()
+        resnets = index.query(model="resnet")
+        accurate = index.query({"metrics/accuracy": lambda a: a > 0.6})
+
+    assert [row["name"] for row in resnets] == ["a", "b"]
+    assert resnets[0]["config"]["lr"] == 0.1
+    assert [row["name"] for row in accurate] == ["b", "c"]
+    assert not os.path.exists(tmp_path / ".bocas" / "index.sqlite")
@@ -0,0 +1,17 @@
+import pytest
+
+from bocas import monitor
+
+
+def test_load_callback_imports_the_named_function(tmp_path):
+    script = tmp_path / "plots.py"
+    script.write_text("def update(update):\n    return 'updated'\n")
+
+    callback = monitor._load_callback(f"{script}:update")
+
+    assert callback(None) == "updated"
+
+
+def test_load_callback_requires_a_function_name():
+    with pytest.raises(ValueError):
+        monitor._load_callback("plots.py")
@@ -0,0 +1,24 @@
+import numpy as np
+
+import bocas
+from bocas.packed import PackedCollection
+from bocas.yamlify import SIDECAR_MIN_SIZE
+
+
+def test_packed_collection_loads_like_the_directory(tmp_path, write_result):
+    artifact_dir = tmp_path / "artifacts"
+    write_result(artifact_dir, "a", {"lr": 0.1}, accuracy=0.5)
+    write_result(artifact_dir, "b", {"lr": 0.01}, curve=list(range(SIDECAR_MIN_SIZE)))
+    archive = str(tmp_path / "artifacts.zip")
+
+    assert sorted(bocas.Result.pack_collection(str(artifact_dir), archive)) == [
+        "a",
+        "b",
+    ]
+    with PackedCollection(archive) as collection:
+        assert sorted(collection.names()) == ["a", "b"]
+        b = collection.load("b")
+
+    assert np.array_equal(b.get("metrics").metrics["curve"], range(SIDECAR_MIN_SIZE))
+    loaded = bocas.Result.load_collection(archive)
+    assert {r.name: r.config.lr for r in loaded} == {"a": 0.1, "b": 0.01}
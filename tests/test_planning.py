@@ -0,0 +1,56 @@
+import ml_collections
+import pytest
+
+from bocas import planning
+
+
+def row(wall_time, **config):
+    return {"config": config, "metrics": {planning.WALL_TIME_METRIC: wall_time}}
+
+
+def job(name, **config):
+    return ml_collections.ConfigDict(config), name, None
+
+
+def test_estimates_come_from_the_most_similar_results():
+    cost_model = planning.CostModel(
+        [row(10.0, model="big", seeds=[1, 2]), row(1.0, model="small", seeds=[1, 2])]
+    )
+
+    # Lists round-trip through JSON as lists, and still match.
+    assert cost_model.estimate({"model": "big", "seeds": (1, 2)}) == 10.0
+    assert cost_model.estimate({"model": "small", "seeds": (1, 2)}) == 1.0
+    assert planning.CostModel([]).estimate({"model": "big"}) is None
+
+
+def test_longest_first_launches_long_configs_first():
+    cost_model = planning.CostModel([row(10.0, model="big"), row(1.0, model="small")])
+    jobs = [
+        job("a", model="small"),
+        job("b", model="big"),
+        job("c", model="small"),
+        job("d", model="big"),
+    ]
+
+    plan = planning.plan(jobs, cost_model, workers=2, order="longest_first")
+
+    assert [name for _, name, _ in plan.jobs] == ["b", "d", "a", "c"]
+    assert plan.positions == [1, 3, 0, 2]
+    assert plan.total == 22.0
+    assert plan.makespan == 11.0
+    assert planning.plan(jobs, cost_model, workers=2, order="sweep").makespan == 12.0
+
+
+def test_cached_jobs_cost_nothing():
+    cost_model = planning.CostModel([row(10.0, model="big")])
+    jobs = [job("a", model="big"), (ml_collections.ConfigDict(), "b", "cached/b")]
+
+    plan = planning.plan(jobs, cost_model)
+
+    assert plan.cached == 1
+    assert plan.total == 10.0
+
+
+def test_unknown_orders_are_rejected():
+    with pytest.raises(ValueError):
+        planning.plan([], planning.CostModel([]), order="shortest_first")
@@ -0,0 +1,39 @@
+import contextlib
+import os
+import time
+
+import ml_collections
+
+import bocas
+from bocas import profiling
+
+
+@contextlib.contextmanager
+def gpu_memory(config):
+    yield {"gpu_memory": config["batch_size"] * 2}
+
+
+def task(config):
+    return bocas.Result("profiled", artifacts=[])
+
+
+def test_profile_records_resources_and_hook_values(tmp_path):
+    with profiling.profile_task(
+        {"batch_size": 8}, cprofile=True, hooks=[gpu_memory]
+    ) as profile:
+        time.sleep(0.05)
+
+    assert profile.metrics["wall_time"] >= 0.05
+    assert profile.metrics["gpu_memory"] == 16
+    assert {"cpu_time", "peak_rss"} <= set(profile.metrics)
+
+    profiling.dump_cprofile(profile, str(tmp_path))
+    assert os.path.exists(tmp_path / profiling.CPROFILE_FILE)
+
+
+def test_results_of_a_run_carry_their_profile(tmp_path):
+    (result,) = bocas.run(task, ml_collections.ConfigDict(), artifact_dir=str(tmp_path))
+    loaded = bocas.Result.load(str(tmp_path / "profiled"))
+
+    assert result.get(profiling.PROFILE_NAME).metrics["wall_time"] >= 0
+    assert "wall_time" in loaded.get(profiling.PROFILE_NAME).metrics
@@ -0,0 +1,36 @@
+import bocas
+
+
+def test_iter_collection_reports_failures_and_keeps_its_order(tmp_path, write_result):
+    for i in range(4):
+        write_result(tmp_path, f"r{i}", accuracy=i)
+    (tmp_path / "broken").mkdir()
+    (tmp_path / "broken" / "results.yaml").write_text("!Result [unclosed")
+    # A config that is still running has no result file yet.
+    (tmp_path / "running").mkdir()
+
+    failures = []
+    serial = [
+        r.name
+        for r in bocas.Result.iter_collection(str(tmp_path), on_error=failures.append)
+    ]
+    parallel = [
+        r.name
+        for r in bocas.Result.iter_collection(
+            str(tmp_path), workers=2, on_error=lambda failure: None
+        )
+    ]
+
+    assert sorted(serial) == ["r0", "r1", "r2", "r3"]
+    assert parallel == serial
+    assert [f.path.rstrip("/").endswith("broken") for f in failures] == [True]
+
+
+def test_unrequested_artifacts_load_on_first_access(tmp_path, write_result):
+    result_dir = write_result(tmp_path, "r", accuracy=0.5)
+
+    result = bocas.Result.load(result_dir, artifacts=[])
+
+    assert isinstance(result.artifacts[0], bocas.artifacts.LazyArtifact)
+    assert result.get("metrics").metrics == {"accuracy": 0.5}
+    assert isinstance(result.artifacts[0], bocas.artifacts.Metrics)
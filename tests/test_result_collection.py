@@ -0,0 +1,56 @@
+import ml_collections
+import numpy as np
+import pytest
+
+import bocas
+
+
+def result(model, seed, accuracy, history):
+    return bocas.Result(
+        f"{model}-{seed}",
+        artifacts=[
+            bocas.artifacts.Metrics({"accuracy": accuracy}, name="eval_metrics"),
+            bocas.artifacts.KerasHistory({"loss": history}, name="fit_history"),
+        ],
+        config=ml_collections.ConfigDict({"model": model, "seed": seed}),
+    )
+
+
+@pytest.fixture
+def collection():
+    return bocas.ResultCollection(
+        [
+            result("resnet", 0, 0.8, [3.0, 2.0]),
+            result("resnet", 1, 0.6, [3.0]),
+            result("vit", 0, 0.9, [4.0, 2.0]),
+        ]
+    )
+
+
+def test_filter_and_best(collection):
+    resnets = collection.filter(model="resnet")
+
+    assert [r.name for r in resnets] == ["resnet-0", "resnet-1"]
+    assert resnets.best("eval_metrics/accuracy").name == "resnet-0"
+    assert collection.best("eval_metrics/accuracy", mode="min").name == "resnet-1"
+    assert len(collection.filter({"eval_metrics/accuracy": lambda a: a > 0.7})) == 2
+
+
+def test_aggregate_over_seeds(collection):
+    groups = {g["model"]: g for g in collection.aggregate("eval_metrics/accuracy")}
+
+    assert groups["resnet"]["count"] == 2
+    assert groups["resnet"]["mean"] == pytest.approx(0.7)
+    assert groups["vit"]["std"] == 0.0
+
+
+def test_stack_history_pads_shorter_curves(collection):
+    stacked = collection.stack_history("fit_history", "loss")
+
+    assert stacked.shape == (3, 2)
+    assert np.isnan(stacked[1, 1])
+
+
+def test_unknown_column_raises(collection):
+    with pytest.raises(ValueError, match="Didn't find a column"):
+        collection.column("missing")
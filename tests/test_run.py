@@ -0,0 +1,84 @@
+import importlib
+import time
+
+import ml_collections
+
+import bocas
+
+# `bocas.run` is the function, the module holds the sweep internals.
+run_module = importlib.import_module("bocas.run")
+
+TASK = """
+import time
+
+import bocas
+
+
+def run(config):
+    time.sleep(config.get("sleep", 0))
+    return bocas.Result(
+        name=f"a={config.a}",
+        artifacts=[bocas.artifacts.Metrics({"a": config.a}, name="metrics")],
+    )
+"""
+
+
+def write_task(tmp_path, source=TASK):
+    path = tmp_path / "run.py"
+    path.write_text(source)
+    return str(path)
+
+
+def sweep(values, **static):
+    config = ml_collections.ConfigDict(static)
+    config.a = bocas.Sweep(values)
+    return config
+
+
+def test_pool_returns_results_in_sweep_order(tmp_path):
+    results = bocas.run(
+        write_task(tmp_path),
+        sweep([3, 1, 2]),
+        artifact_dir=str(tmp_path / "artifacts"),
+        max_workers=2,
+    )
+
+    assert [r.name for r in results] == ["a=3", "a=1", "a=2"]
+
+
+def test_pool_expands_the_sweep_lazily(tmp_path, monkeypatch):
+    drawn = []
+    iter_configs = run_module._iter_configs
+
+    def counting_iter_configs(*args, **kwargs):
+        for config in iter_configs(*args, **kwargs):
+            drawn.append(config)
+            yield config
+
+    monkeypatch.setattr(run_module, "_iter_configs", counting_iter_configs)
+    results = bocas.run_iter(
+        write_task(tmp_path),
+        sweep(list(range(40)), sleep=0.2),
+        artifact_dir=str(tmp_path / "artifacts"),
+        max_workers=2,
+    )
+    next(results)
+    results.close()
+
+    assert len(drawn) < 10
+
+
+def test_run_iter_yields_each_result_once_written(tmp_path):
+    for max_workers in (None, 1):
+        start = time.monotonic()
+        results = bocas.run_iter(
+            write_task(tmp_path),
+            sweep([1, 2], sleep=1.0),
+            artifact_dir=str(tmp_path / f"artifacts-{max_workers}"),
+            max_workers=max_workers,
+        )
+        first = next(results)
+        # The second config takes until about 2s to finish.
+        assert time.monotonic() - start < 1.8
+        assert first.name == "a=1"
+        assert [r.name for r in results] == ["a=2"]
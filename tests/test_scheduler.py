@@ -0,0 +1,65 @@
+import ml_collections
+import pytest
+
+import bocas
+from bocas import scheduler as scheduling
+
+calls = []
+
+
+def task(config):
+    calls.append(config.quality)
+    for epoch in range(1, 5):
+        bocas.report(epoch, {"accuracy": config.quality * epoch})
+    return bocas.Result(name=f"quality={config.quality}", artifacts=[])
+
+
+def sweep():
+    config = ml_collections.ConfigDict()
+    config.quality = bocas.Sweep([3, 2, 1])
+    return config
+
+
+def test_rungs_are_geometric_and_capped():
+    scheduler = bocas.SuccessiveHalving("accuracy", min_step=2, max_step=20)
+
+    assert [scheduler.rung_step(0, rung) for rung in range(4)] == [2, 6, 18, None]
+
+
+def test_only_the_top_fraction_is_promoted():
+    scheduler = bocas.SuccessiveHalving("accuracy", reduction_factor=2)
+
+    assert scheduler.should_continue(0.9, [0.9, 0.1])
+    assert not scheduler.should_continue(0.1, [0.9, 0.1])
+    # A lone config has nothing to be compared with.
+    assert scheduler.should_continue(0.1, [0.1])
+
+
+def test_trial_is_pruned_when_behind_at_a_rung(tmp_path):
+    scheduler = bocas.SuccessiveHalving("accuracy", reduction_factor=2)
+    with scheduling.trial_context(scheduler, str(tmp_path), "good") as trial:
+        bocas.report(1, {"accuracy": 0.9})
+    assert trial.pruned is None
+
+    with scheduling.trial_context(scheduler, str(tmp_path), "bad") as trial:
+        with pytest.raises(bocas.Pruned):
+            bocas.report(1, {"accuracy": 0.1})
+    assert scheduling.is_pruned(bocas.Result("bad", artifacts=trial.artifacts()))
+
+
+def test_pruned_results_are_only_reused_with_the_same_scheduler(tmp_path):
+    artifact_dir = str(tmp_path)
+    scheduler = bocas.SuccessiveHalving("accuracy", reduction_factor=2)
+    calls.clear()
+    results = bocas.run(task, sweep(), artifact_dir=artifact_dir, scheduler=scheduler)
+    assert calls == [3, 2, 1]
+    assert [scheduling.is_pruned(r) for r in results] == [False, True, True]
+
+    calls.clear()
+    bocas.run(task, sweep(), artifact_dir=artifact_dir, scheduler=scheduler)
+    assert calls == []
+
+    calls.clear()
+    results = bocas.run(task, sweep(), artifact_dir=artifact_dir)
+    assert calls == [2, 1]
+    assert [r.name for r in results] == ["quality=3", "quality=2", "quality=1"]
@@ -0,0 +1,72 @@
+import os
+import threading
+from multiprocessing import connection
+
+import ml_collections
+import pytest
+
+import bocas
+from bocas import server
+
+TASK = """
+import bocas
+
+
+def run(config):
+    return bocas.Result(
+        name=f"a={config.a}",
+        artifacts=[bocas.artifacts.Metrics({"a": config.a}, name="metrics")],
+    )
+"""
+
+
+def test_default_address_is_resolved_lazily(monkeypatch, tmp_path):
+    def no_user():
+        raise KeyError("getpwuid(): uid not found")
+
+    monkeypatch.setattr(server.getpass, "getuser", no_user)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+
+    assert server.default_address() == str(tmp_path / "bocas" / "server.sock")
+
+
+def test_server_runs_sweeps_of_authenticated_clients(tmp_path):
+    task = tmp_path / "run.py"
+    task.write_text(TASK)
+    address = str(tmp_path / "socket" / "server.sock")
+    srv = server.Server(address, max_workers=1)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    try:
+        with pytest.raises(connection.AuthenticationError):
+            connection.Client(address, family="AF_UNIX", authkey=b"wrong")
+
+        config = ml_collections.ConfigDict({"a": bocas.Sweep([2, 1])})
+        results = server.submit(
+            str(task), config, address=address, artifact_dir=str(tmp_path / "art")
+        )
+    finally:
+        srv.close()
+
+    assert [r.name for r in results] == ["a=2", "a=1"]
+    assert not os.path.exists(address + server.AUTHKEY_SUFFIX)
+
+
+def test_server_refuses_a_directory_writable_by_others(tmp_path):
+    directory = tmp_path / "shared"
+    directory.mkdir()
+    directory.chmod(0o777)
+
+    with pytest.raises(ValueError, match="writable by other users"):
+        server.Server(str(directory / "server.sock"))
+
+
+def test_warm_tasks_are_reloaded_when_their_source_changes(tmp_path):
+    path = tmp_path / "run.py"
+    path.write_text("VERSION = 1\n\ndef run(config):\n    pass\n")
+    first = server._load_warm_task(str(path))
+    assert server._load_warm_task(str(path)) is first
+
+    path.write_text("VERSION = 2\n\ndef run(config):\n    pass\n")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+
+    assert server._load_warm_task(str(path)) is not first
@@ -0,0 +1,46 @@
+import ml_collections
+import pytest
+
+import bocas
+from bocas import stages
+
+calls = []
+
+
+def load_dataset(config):
+    calls.append(config.data.name)
+    return [config.data.name] * 2
+
+
+def config(name, lr=0.1):
+    return ml_collections.ConfigDict({"data": {"name": name}, "lr": lr})
+
+
+def test_stage_runs_once_per_value_of_its_keys():
+    stage = bocas.cached_stage(keys="data.name", maxsize=1)(load_dataset)
+    calls.clear()
+
+    stage(config("mnist"))
+    stage(config("mnist", lr=0.01))
+    stage(config("cifar"))
+    stage(config("mnist"))
+
+    assert calls == ["mnist", "cifar", "mnist"]
+    assert (stage.hits, stage.misses) == (1, 3)
+
+
+def test_disk_outputs_are_shared_across_stages(tmp_path):
+    calls.clear()
+    with stages.artifact_dir_context(str(tmp_path)):
+        first = bocas.cached_stage(keys=["data.name"], disk=True)(load_dataset)
+        second = bocas.cached_stage(keys=["data.name"], disk=True)(load_dataset)
+
+        assert first(config("mnist")) == second(config("mnist"))
+    assert calls == ["mnist"]
+
+
+def test_missing_key_raises():
+    stage = bocas.cached_stage(keys=["data.size"])(load_dataset)
+
+    with pytest.raises(ValueError, match="data.size"):
+        stage(config("mnist"))
@@ -0,0 +1,102 @@
+import importlib
+
+import ml_collections
+import pytest
+
+import bocas
+
+# `bocas.run` is the function, the module holds the sweep internals.
+run_module = importlib.import_module("bocas.run")
+
+
+def expand(config, **kwargs):
+    return [c.to_dict() for c in run_module._iter_configs(config, **kwargs)]
+
+
+def test_zipped_sweeps_advance_together():
+    config = ml_collections.ConfigDict()
+    config.model = bocas.Zip("model", ["resnet", "vit"])
+    config.batch_size = bocas.Zip("model", [256, 64])
+    config.seed = bocas.Sweep([0, 1])
+
+    assert [(c["model"], c["batch_size"], c["seed"]) for c in expand(config)] == [
+        ("resnet", 256, 0),
+        ("resnet", 256, 1),
+        ("vit", 64, 0),
+        ("vit", 64, 1),
+    ]
+
+
+def test_zipped_sweeps_must_have_the_same_length():
+    config = ml_collections.ConfigDict()
+    config.model = bocas.Zip("model", ["resnet", "vit"])
+    config.batch_size = bocas.Zip("model", [256])
+
+    with pytest.raises(ValueError, match="same number of items"):
+        expand(config)
+
+
+def test_nested_sweeps_and_constraints():
+    config = ml_collections.ConfigDict()
+    config.optimizer = ml_collections.ConfigDict()
+    config.optimizer.name = "adam"
+    config.optimizer.lr = bocas.Sweep([0.1, 0.01])
+    config.layers = bocas.Sweep([1, 2])
+
+    configs = expand(config, constraints=[lambda c: c.layers * c.optimizer.lr < 0.15])
+
+    assert configs == [
+        {"optimizer": {"name": "adam", "lr": 0.1}, "layers": 1},
+        {"optimizer": {"name": "adam", "lr": 0.01}, "layers": 1},
+        {"optimizer": {"name": "adam", "lr": 0.01}, "layers": 2},
+    ]
+
+
+def test_random_search_draws_budget_configs_per_sweep_value():
+    config = ml_collections.ConfigDict()
+    config.lr = bocas.Uniform(1e-4, 1e-1, log=True)
+    config.optimizer = bocas.Choice(["sgd", "adam"])
+    config.seed = bocas.Sweep([0, 1])
+
+    configs = expand(config, search=bocas.RandomSweep(budget=5, seed=3))
+
+    assert len(configs) == 10
+    assert all(1e-4 <= c["lr"] <= 1e-1 for c in configs)
+    assert {c["optimizer"] for c in configs} <= {"sgd", "adam"}
+    assert configs == expand(config, search=bocas.RandomSweep(budget=5, seed=3))
+
+
+def test_distributions_require_a_search():
+    config = ml_collections.ConfigDict()
+    config.lr = bocas.Uniform(0.0, 1.0)
+
+    with pytest.raises(ValueError, match="search"):
+        expand(config)
+
+
+def test_sobol_points_cover_each_half_evenly():
+    pytest.importorskip("scipy")
+    points = list(bocas.SobolSweep(budget=8).points(2))
+
+    assert len(points) == 8
+    assert sum(x < 0.5 for x, _ in points) == 4
+
+
+def task(config):
+    accuracy = 1 - (config.x - 0.7) ** 2
+    return bocas.Result(
+        f"x={config.x}",
+        artifacts=[bocas.artifacts.Metrics({"accuracy": accuracy}, name="eval")],
+    )
+
+
+def test_adaptive_search_draws_near_the_best_results(tmp_path):
+    config = ml_collections.ConfigDict()
+    config.x = bocas.Uniform(0.0, 1.0)
+    search = bocas.AdaptiveSweep("eval/accuracy", budget=24, initial=8)
+
+    results = bocas.run(task, config, artifact_dir=str(tmp_path), search=search)
+    distances = [abs(r.config.x - 0.7) for r in results]
+
+    assert len(results) == 24
+    assert sum(distances[8:]) / 16 < sum(distances[:8]) / 8
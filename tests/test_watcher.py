@@ -0,0 +1,36 @@
+import shutil
+import threading
+
+import bocas
+
+
+def test_poll_only_reports_changes(tmp_path, write_result):
+    write_result(tmp_path, "a", {"lr": 0.1}, accuracy=0.5)
+    with bocas.Watcher(str(tmp_path)) as watcher:
+        update = watcher.poll()
+        assert [r.name for r in update.changed] == ["a"]
+        assert watcher.poll() is None
+
+        write_result(tmp_path, "b", {"lr": 0.2}, accuracy=0.9)
+        update = watcher.poll()
+        assert [r.name for r in update.changed] == ["b"]
+        assert watcher.collection().best("metrics/accuracy").name == "b"
+
+        shutil.rmtree(tmp_path / "b")
+        update = watcher.poll()
+        assert update.removed == ["b"]
+        assert sorted(watcher.results) == ["a"]
+
+
+def test_watch_calls_back_until_stopped(tmp_path, write_result):
+    write_result(tmp_path, "a", accuracy=0.5)
+    stop = threading.Event()
+    updates = []
+
+    def callback(update):
+        updates.append([r.name for r in update.changed])
+        stop.set()
+
+    bocas.watch(str(tmp_path), callback, interval=0.1, stop=stop)
+
+    assert updates == [["a"]]
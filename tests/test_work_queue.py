@@ -0,0 +1,31 @@
+import time
+
+from bocas.work_queue import WorkQueue
+
+
+def test_items_are_claimed_by_one_node_and_done_per_task_version(tmp_path):
+    with WorkQueue(str(tmp_path), "v1") as a, WorkQueue(str(tmp_path), "v1") as b:
+        assert a.claim("item")
+        assert not b.claim("item")
+
+        a.complete("item", "a=1")
+        assert b.done("item") == "a=1"
+        assert b.claim("item")
+
+    with WorkQueue(str(tmp_path), "v2") as edited:
+        assert edited.done("item") is None
+
+
+def test_heartbeats_keep_leases_and_dead_nodes_are_reclaimed(tmp_path):
+    with WorkQueue(str(tmp_path), lease_timeout=0.4) as alive, WorkQueue(
+        str(tmp_path), lease_timeout=0.4
+    ) as other:
+        assert alive.claim("item")
+        time.sleep(0.6)
+        assert not other.claim("item")
+
+        # A node that dies stops renewing its leases, without releasing them.
+        alive._stopped.set()
+        alive._heartbeat.join()
+        time.sleep(0.6)
+        assert other.claim("item")
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from bocas.writer import ResultWriter, atomic_write
+
+
+def test_atomic_write_replaces_without_leaving_temporary_files(tmp_path):
+    path = tmp_path / "results.yaml"
+    atomic_write(str(path), "old")
+    atomic_write(str(path), b"new")
+
+    assert path.read_text() == "new"
+    assert os.listdir(tmp_path) == ["results.yaml"]
+
+
+def test_writer_keeps_writing_after_an_error_and_raises_it_on_close():
+    written = []
+
+    def write(value):
+        if value == 2:
+            raise OSError("disk full")
+        written.append(value)
+
+    writer = ResultWriter(write)
+    for value in range(4):
+        writer.submit(value)
+    with pytest.raises(RuntimeError, match="Failed to write 1 result") as info:
+        writer.close()
+
+    assert written == [0, 1, 3]
+    assert isinstance(info.value.__cause__, OSError)
+    with pytest.raises(ValueError, match="closed"):
+        writer.submit(4)
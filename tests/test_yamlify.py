@@ -0,0 +1,84 @@
+import subprocess
+import sys
+
+import ml_collections
+import numpy as np
+import pytest
+import yaml
+
+import bocas
+from bocas import yamlify
+from bocas.run import serialize_yaml
+
+
+def nested_config():
+    config = ml_collections.ConfigDict()
+    config.seed = 1
+    config.model = ml_collections.ConfigDict()
+    config.model.kind = "resnet"
+    config.model.head = ml_collections.ConfigDict({"units": 10, "dropout": 0.5})
+    return config
+
+
+def test_config_dict_round_trip_keeps_nested_sections():
+    config = yamlify.load(yamlify.dump(nested_config()))
+
+    assert isinstance(config, ml_collections.ConfigDict)
+    assert config.to_dict() == nested_config().to_dict()
+
+
+def test_result_round_trip_keeps_nested_config(tmp_path):
+    result = bocas.Result(
+        "nested",
+        artifacts=[bocas.artifacts.Metrics({"accuracy": 0.5}, name="eval_metrics")],
+        config=nested_config(),
+    )
+    result_dir = tmp_path / "nested"
+    result_dir.mkdir()
+    serialize_yaml(result, str(result_dir))
+
+    loaded = bocas.Result.load(str(result_dir))
+
+    assert loaded.config.model.kind == "resnet"
+    assert loaded.config.model.head.units == 10
+    assert loaded.config.to_dict() == nested_config().to_dict()
+
+
+def test_custom_tags_round_trip_without_touching_global_yaml():
+    data = {"shape": (2, 3), "loss": np.float32(0.25)}
+
+    serialized = yamlify.dump(data)
+
+    assert yamlify.load(serialized) == data
+    with pytest.raises(yaml.constructor.ConstructorError):
+        yaml.safe_load(serialized)
+
+
+def test_large_numeric_payloads_are_stored_in_sidecars(tmp_path):
+    long = [float(i) for i in range(yamlify.SIDECAR_MIN_SIZE)]
+    result = bocas.Result(
+        "arrays",
+        artifacts=[
+            bocas.artifacts.Metrics({"long": long, "short": [1.0, 2.0]}, name="m")
+        ],
+    )
+    serialize_yaml(result, str(tmp_path))
+
+    assert len(list(tmp_path.rglob("*.npy"))) == 1
+    metrics = bocas.Result.load(str(tmp_path)).get("m").metrics
+    assert np.array_equal(metrics["long"], long)
+    assert list(metrics["short"]) == [1.0, 2.0]
+
+
+def test_numpy_imported_mid_dump_is_represented():
+    # `Metrics.to_yaml()` imports numpy while the document is being dumped.
+    code = (
+        "import sys; from bocas import artifacts, yamlify; "
+        "assert 'numpy' not in sys.modules; "
+        "print(yamlify.dump(artifacts.Metrics({'loss': [1.0, 2.0]}, name='m')))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert yamlify.load(output.stdout).metrics == {"loss": [1.0, 2.0]}